@@ -0,0 +1,36 @@
+"""
+Run the API server with the configured WebSocket keepalive.
+
+Usage (from the backend directory):
+    python -m app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import argparse
+import uvicorn
+from app.config import get_settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Mock Web3 Wallet API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--reload", action="store_true")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=args.reload,
+        # Protocol-level ping/pong: half-open sockets are closed by the server
+        ws_ping_interval=settings.ws_ping_interval_seconds,
+        ws_ping_timeout=settings.ws_ping_timeout_seconds,
+        # Per-message deflate keeps compression state per socket; idle sockets don't need it
+        ws_per_message_deflate=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
-from app.database import get_db
-from app.models import Wallet
+from app.config import get_settings
+from app.database import get_wallet_db, wallet_session
+from app.models import INITIAL_BALANCE, Wallet
 import secrets
 import hashlib
-import os
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 # Create router instance
 router = APIRouter()
@@ -21,11 +17,6 @@ router = APIRouter()
 # Security scheme
 security = HTTPBearer()
 
-# JWT Configuration from environment
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-
 
 # ===== Pydantic Models (Request/Response schemas) =====
 
@@ -115,14 +106,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     Returns:
         str: JWT token
     """
+    settings = get_settings()
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
 
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
@@ -139,8 +131,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     Raises:
         HTTPException: If token is invalid
     """
+    settings = get_settings()
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(credentials.credentials, settings.secret_key, algorithms=[settings.algorithm])
         wallet_address: str = payload.get("sub")
         if wallet_address is None:
             raise HTTPException(
@@ -157,13 +150,12 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
         )
 
 
-def get_current_wallet(wallet_address: str = Depends(verify_token), db: Session = Depends(get_db)):
+def get_current_wallet(wallet_address: str = Depends(verify_token)):
     """
     Dependency to get current authenticated wallet.
 
     Args:
         wallet_address: Wallet address from token
-        db: Database session
 
     Returns:
         Wallet: Wallet object
@@ -171,7 +163,8 @@ def get_current_wallet(wallet_address: str = Depends(verify_token), db: Session
     Raises:
         HTTPException: If wallet not found
     """
-    wallet = db.query(Wallet).filter(Wallet.address == wallet_address).first()
+    with wallet_session(wallet_address) as db:
+        wallet = db.query(Wallet).filter(Wallet.address == wallet_address).first()
     if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,13 +176,12 @@ def get_current_wallet(wallet_address: str = Depends(verify_token), db: Session
 # ===== API Routes =====
 
 @router.post("/register", response_model=WalletResponse, status_code=status.HTTP_201_CREATED)
-async def register_wallet(wallet_data: WalletCreate, db: Session = Depends(get_db)):
+async def register_wallet(wallet_data: WalletCreate):
     """
     Create a new wallet with generated address and private key.
     
     Args:
         wallet_data: Password for the wallet
-        db: Database session
         
     Returns:
         WalletResponse: New wallet details including address, balance, and private key
@@ -201,24 +193,25 @@ async def register_wallet(wallet_data: WalletCreate, db: Session = Depends(get_d
     address = generate_wallet_address()
     private_key = generate_private_key()
     
-    # Check if address already exists (unlikely but good practice)
-    existing = db.query(Wallet).filter(Wallet.address == address).first()
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, 
-            detail="Wallet already exists (collision detected)"
+    with wallet_session(address) as db:
+        # Check if address already exists (unlikely but good practice)
+        existing = db.query(Wallet).filter(Wallet.address == address).first()
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, 
+                detail="Wallet already exists (collision detected)"
+            )
+        
+        # Create new wallet in database
+        wallet = Wallet(
+            address=address,
+            private_key=private_key,
+            balance=INITIAL_BALANCE  # Initial balance: 3.34 ETH
         )
-    
-    # Create new wallet in database
-    wallet = Wallet(
-        address=address,
-        private_key=private_key,
-        balance=3.34  # Initial balance: 3.34 ETH
-    )
-    
-    db.add(wallet)
-    db.commit()
-    db.refresh(wallet)
+        
+        db.add(wallet)
+        db.commit()
+        db.refresh(wallet)
     
     return WalletResponse(
         address=wallet.address,
@@ -229,13 +222,12 @@ async def register_wallet(wallet_data: WalletCreate, db: Session = Depends(get_d
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login_wallet(wallet_data: WalletLogin, db: Session = Depends(get_db)):
+async def login_wallet(wallet_data: WalletLogin):
     """
     Login to existing wallet using address and return JWT token.
 
     Args:
         wallet_data: Wallet address and password
-        db: Database session
 
     Returns:
         TokenResponse: JWT access token and wallet info
@@ -244,7 +236,8 @@ async def login_wallet(wallet_data: WalletLogin, db: Session = Depends(get_db)):
         HTTPException: If wallet not found
     """
     # Find wallet by address
-    wallet = db.query(Wallet).filter(Wallet.address == wallet_data.address).first()
+    with wallet_session(wallet_data.address) as db:
+        wallet = db.query(Wallet).filter(Wallet.address == wallet_data.address).first()
 
     if not wallet:
         raise HTTPException(
@@ -266,38 +259,38 @@ async def login_wallet(wallet_data: WalletLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/import")
-async def import_wallet(wallet_data: WalletImport, db: Session = Depends(get_db)):
+async def import_wallet(wallet_data: WalletImport):
     """
     Import existing wallet using address and private key.
     
     Args:
         wallet_data: Wallet address and private key
-        db: Database session
         
     Returns:
         dict: Import confirmation and wallet details
     """
-    # Check if wallet already exists in database
-    existing = db.query(Wallet).filter(Wallet.address == wallet_data.address).first()
-    
-    if existing:
-        # Wallet already in database
-        return {
-            "address": existing.address,
-            "balance": existing.balance,
-            "message": "Wallet already exists and has been loaded"
-        }
-    
-    # Import new wallet into database
-    wallet = Wallet(
-        address=wallet_data.address,
-        private_key=wallet_data.private_key,
-        balance=3.34  # Default balance for imported wallets
-    )
-    
-    db.add(wallet)
-    db.commit()
-    db.refresh(wallet)
+    with wallet_session(wallet_data.address) as db:
+        # Check if wallet already exists in database
+        existing = db.query(Wallet).filter(Wallet.address == wallet_data.address).first()
+        
+        if existing:
+            # Wallet already in database
+            return {
+                "address": existing.address,
+                "balance": existing.balance,
+                "message": "Wallet already exists and has been loaded"
+            }
+        
+        # Import new wallet into database
+        wallet = Wallet(
+            address=wallet_data.address,
+            private_key=wallet_data.private_key,
+            balance=INITIAL_BALANCE  # Default balance for imported wallets
+        )
+        
+        db.add(wallet)
+        db.commit()
+        db.refresh(wallet)
     
     return {
         "address": wallet.address,
@@ -307,7 +300,7 @@ async def import_wallet(wallet_data: WalletImport, db: Session = Depends(get_db)
 
 
 @router.get("/verify/{address}")
-async def verify_wallet(address: str, db: Session = Depends(get_db)):
+async def verify_wallet(address: str, db: Session = Depends(get_wallet_db)):
     """
     Verify if a wallet address exists in the system.
     
@@ -0,0 +1,131 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+def _env_optional_int(name: str, default: Optional[int]) -> Optional[int]:
+    """Read an integer setting where an empty value or 0 means disabled"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    if not value.strip():
+        return None
+    return int(value) or None
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting ("1", "true", "yes" or "on" mean True)"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Application configuration, resolved once from the environment"""
+    database_url: str = "sqlite:///./wallet.db"
+    secret_key: str = "your-secret-key"
+    algorithm: str = "HS256"
+    access_token_expire_minutes: int = 30
+    cors_origins: tuple[str, ...] = ("http://localhost:3000",)
+
+    # Notification retention (opt-in: None disables a rule or the job)
+    notification_max_age_days: Optional[int] = None
+    notification_max_per_wallet: Optional[int] = None
+    notification_keep_unread: bool = True
+    notification_archive_dir: Optional[str] = None
+    compaction_interval_seconds: Optional[int] = None
+    compaction_batch_size: int = 1000
+
+    # Requests allowed to wait on one in-flight read before running their own
+    singleflight_max_waiters: int = 1000
+
+    # Server-Sent Events transaction streams
+    sse_heartbeat_seconds: float = 15.0
+    sse_buffer_size: int = 100
+    sse_retry_ms: int = 2000
+
+    # WebSocket connections
+    ws_max_connections: int = 20000
+    ws_idle_timeout_seconds: Optional[int] = None
+    ws_reap_interval_seconds: int = 30
+    ws_max_pending: int = 256
+    ws_ping_interval_seconds: float = 20.0
+    ws_ping_timeout_seconds: float = 20.0
+
+    # Address-sharded storage (empty: single database at database_url; when
+    # set, database_url only holds the background job leases)
+    shard_urls: tuple[str, ...] = ()
+    shard_recovery_interval_seconds: Optional[int] = 60
+
+    # Periodic balance snapshots for point-in-time balance queries
+    snapshot_interval_seconds: Optional[int] = 3600
+    snapshot_retention_days: Optional[int] = 30
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Build settings from environment variables (and a .env file, if present).
+
+        Returns:
+            Settings: Resolved configuration
+        """
+        # Imported here so that importing this module has no side effects
+        from dotenv import load_dotenv
+
+        load_dotenv()
+
+        return cls(
+            database_url=os.getenv("DATABASE_URL", cls.database_url),
+            secret_key=os.getenv("SECRET_KEY", cls.secret_key),
+            algorithm=os.getenv("ALGORITHM", cls.algorithm),
+            access_token_expire_minutes=int(
+                os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", cls.access_token_expire_minutes)
+            ),
+            cors_origins=tuple(
+                origin.strip()
+                for origin in os.getenv("CORS_ORIGINS", ",".join(cls.cors_origins)).split(",")
+                if origin.strip()
+            ),
+            notification_max_age_days=_env_optional_int(
+                "NOTIFICATION_MAX_AGE_DAYS", cls.notification_max_age_days
+            ),
+            notification_max_per_wallet=_env_optional_int(
+                "NOTIFICATION_MAX_PER_WALLET", cls.notification_max_per_wallet
+            ),
+            notification_keep_unread=_env_bool("NOTIFICATION_KEEP_UNREAD", cls.notification_keep_unread),
+            notification_archive_dir=os.getenv("NOTIFICATION_ARCHIVE_DIR") or None,
+            compaction_interval_seconds=_env_optional_int(
+                "COMPACTION_INTERVAL_SECONDS", cls.compaction_interval_seconds
+            ),
+            compaction_batch_size=int(os.getenv("COMPACTION_BATCH_SIZE", cls.compaction_batch_size)),
+            singleflight_max_waiters=int(os.getenv("SINGLEFLIGHT_MAX_WAITERS", cls.singleflight_max_waiters)),
+            sse_heartbeat_seconds=float(os.getenv("SSE_HEARTBEAT_SECONDS", cls.sse_heartbeat_seconds)),
+            sse_buffer_size=int(os.getenv("SSE_BUFFER_SIZE", cls.sse_buffer_size)),
+            sse_retry_ms=int(os.getenv("SSE_RETRY_MS", cls.sse_retry_ms)),
+            ws_max_connections=int(os.getenv("WS_MAX_CONNECTIONS", cls.ws_max_connections)),
+            ws_idle_timeout_seconds=_env_optional_int("WS_IDLE_TIMEOUT_SECONDS", cls.ws_idle_timeout_seconds),
+            ws_reap_interval_seconds=int(os.getenv("WS_REAP_INTERVAL_SECONDS", cls.ws_reap_interval_seconds)),
+            ws_max_pending=int(os.getenv("WS_MAX_PENDING", cls.ws_max_pending)),
+            ws_ping_interval_seconds=float(os.getenv("WS_PING_INTERVAL_SECONDS", cls.ws_ping_interval_seconds)),
+            ws_ping_timeout_seconds=float(os.getenv("WS_PING_TIMEOUT_SECONDS", cls.ws_ping_timeout_seconds)),
+            shard_urls=tuple(url.strip() for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()),
+            shard_recovery_interval_seconds=_env_optional_int(
+                "SHARD_RECOVERY_INTERVAL_SECONDS", cls.shard_recovery_interval_seconds
+            ),
+            snapshot_interval_seconds=_env_optional_int(
+                "SNAPSHOT_INTERVAL_SECONDS", cls.snapshot_interval_seconds
+            ),
+            snapshot_retention_days=_env_optional_int("SNAPSHOT_RETENTION_DAYS", cls.snapshot_retention_days),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings object.
+    The environment is read on first call only.
+    """
+    return Settings.from_env()
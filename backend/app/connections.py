@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import Optional
+from fastapi import WebSocket, WebSocketDisconnect, status
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Close code for connections that exceeded the idle timeout ("going away")
+CLOSE_IDLE = 1001
+# Close code for connections that fell too far behind on outbound messages
+CLOSE_SLOW_CONSUMER = status.WS_1008_POLICY_VIOLATION
+
+PONG = '{"type":"pong"}'
+
+
+def _is_ping(data: str) -> bool:
+    try:
+        message = json.loads(data)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("type") == "ping"
+
+
+class Connection:
+    """One WebSocket and the outbound messages waiting to be flushed to it"""
+
+    __slots__ = ("wallet_address", "websocket", "last_activity", "pending", "flushing", "closed")
+
+    def __init__(self, wallet_address: str, websocket: WebSocket):
+        self.wallet_address = wallet_address
+        self.websocket = websocket
+        self.last_activity = time.monotonic()
+        self.pending: list[str] = []
+        self.flushing = False
+        self.closed = False
+
+
+class ConnectionManager:
+    """
+    Tracks WebSocket connections per wallet address.
+
+    Liveness is left to protocol-level ping/pong (see `python -m app`), which
+    closes half-open sockets at the transport. Those pongs are answered inside
+    the server and never reach this class, so the optional idle reaper
+    (idle_timeout, off by default) only sees application frames: with it on,
+    receive-only clients must send {"type": "ping"} more often than the
+    timeout. The total number of connections is capped.
+
+    Outbound messages are JSON strings. Messages queued for a socket while a
+    send is in progress are coalesced into one {"type": "batch"} frame.
+    """
+
+    def __init__(self, max_connections: int = 20000, idle_timeout: Optional[float] = None,
+                 max_pending: int = 256):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.max_pending = max_pending
+        self.active_connections: dict[str, set[Connection]] = {}
+        self.connection_count = 0
+        self.rejected = 0
+        self.reaped = 0
+        self.frames_sent = 0
+        self.messages_sent = 0
+        # Strong references to flush/close tasks until they finish
+        self._tasks: set[asyncio.Task] = set()
+
+    async def connect(self, wallet_address: str, websocket: WebSocket) -> Optional[Connection]:
+        """
+        Accept a WebSocket, or reject it if the server is at capacity.
+
+        Returns:
+            Optional[Connection]: The connection, or None if rejected
+        """
+        if self.connection_count >= self.max_connections:
+            self.rejected += 1
+            # Closing before accept() would refuse the handshake with HTTP 403;
+            # accept first so the client sees close code 1013 (try again later)
+            await websocket.accept()
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return None
+
+        await websocket.accept()
+        connection = Connection(wallet_address, websocket)
+        self.active_connections.setdefault(wallet_address, set()).add(connection)
+        self.connection_count += 1
+        return connection
+
+    def disconnect(self, connection: Connection):
+        connection.closed = True
+        connection.pending.clear()
+        connections = self.active_connections.get(connection.wallet_address)
+        if connections is None or connection not in connections:
+            return
+        connections.discard(connection)
+        self.connection_count -= 1
+        if not connections:
+            del self.active_connections[connection.wallet_address]
+
+    async def send_personal_message(self, message: str, wallet_address: str):
+        """
+        Queue a JSON message for every connection of a wallet.
+        Delivery happens in the background; this never waits on a socket.
+        """
+        for connection in list(self.active_connections.get(wallet_address, ())):
+            self._enqueue(connection, message)
+
+    def _enqueue(self, connection: Connection, message: str):
+        if connection.closed:
+            return
+        if len(connection.pending) >= self.max_pending:
+            # The client is not keeping up; it can reconnect and catch up
+            self._spawn(self._close(connection, CLOSE_SLOW_CONSUMER))
+            return
+        connection.pending.append(message)
+        if not connection.flushing:
+            connection.flushing = True
+            self._spawn(self._flush(connection))
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, connection: Connection):
+        try:
+            while connection.pending and not connection.closed:
+                messages, connection.pending = connection.pending, []
+                if len(messages) == 1:
+                    frame = messages[0]
+                else:
+                    frame = '{"type":"batch","events":[' + ",".join(messages) + "]}"
+                await connection.websocket.send_text(frame)
+                connection.last_activity = time.monotonic()
+                self.frames_sent += 1
+                self.messages_sent += len(messages)
+        except Exception:
+            # The receive loop sees the disconnect and cleans up
+            connection.pending.clear()
+        finally:
+            connection.flushing = False
+
+    async def _close(self, connection: Connection, code: int):
+        if connection.closed:
+            return
+        self.disconnect(connection)
+        try:
+            await connection.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def reap_idle(self) -> int:
+        """
+        Close connections idle for longer than idle_timeout.
+
+        Returns:
+            int: Number of connections closed
+        """
+        if not self.idle_timeout:
+            return 0
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [
+            connection
+            for connections in self.active_connections.values()
+            for connection in connections
+            if connection.last_activity < deadline
+        ]
+        for connection in idle:
+            await self._close(connection, CLOSE_IDLE)
+        self.reaped += len(idle)
+        if idle:
+            logger.info("Closed %d idle WebSocket connections", len(idle))
+        return len(idle)
+
+    async def run_reaper(self, interval_seconds: float):
+        """Call reap_idle() every interval_seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.reap_idle()
+            except Exception:
+                logger.exception("WebSocket reaper failed")
+
+    async def serve(self, wallet_address: str, websocket: WebSocket):
+        """Run one WebSocket until the client disconnects or it is closed"""
+        connection = await self.connect(wallet_address, websocket)
+        if connection is None:
+            return
+        try:
+            while True:
+                data = await websocket.receive_text()
+                connection.last_activity = time.monotonic()
+                # Application-level heartbeat for clients that cannot rely on protocol pings;
+                # any other frame only counts as activity
+                if _is_ping(data):
+                    self._enqueue(connection, PONG)
+        except (WebSocketDisconnect, RuntimeError):
+            # RuntimeError: the socket was closed by the reaper while receiving
+            pass
+        finally:
+            self.disconnect(connection)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connection_count,
+            "wallets": len(self.active_connections),
+            "rejected": self.rejected,
+            "reaped": self.reaped,
+            "frames_sent": self.frames_sent,
+            "messages_sent": self.messages_sent,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_manager() -> ConnectionManager:
+    """Return the process-wide WebSocket connection manager"""
+    settings = get_settings()
+    return ConnectionManager(
+        max_connections=settings.ws_max_connections,
+        idle_timeout=settings.ws_idle_timeout_seconds,
+        max_pending=settings.ws_max_pending,
+    )
@@ -0,0 +1,203 @@
+"""
+Counterparty index maintenance.
+
+Every completed transfer bumps two edges, (sender, recipient) and
+(recipient, sender), with a running transfer count, volume and last-seen
+time. Rebuild the index from the transactions ledger, one address range at
+a time, with:
+    python -m app.counterparties --chunk-size 10000
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, case, func, insert, select, true
+from sqlalchemy.orm import Session
+from app.database import session_scope
+from app.models import DEBITED_STATUSES, CounterpartyEdge, Transaction, Wallet
+
+
+def _edge_rows(sender: str, recipient: str, amount: float, at: datetime, count: int = 1) -> list[dict]:
+    """Edge increments for one transfer (a self-transfer produces a single edge)"""
+    pairs = {(sender, recipient), (recipient, sender)}
+    return [
+        {"address": address, "counterparty": counterparty, "tx_count": count, "volume": amount, "last_seen": at}
+        for address, counterparty in pairs
+    ]
+
+
+def _upsert_edges(db: Session, rows: list[dict]):
+    """
+    Add edge increments to the index.
+    Uses a native upsert on SQLite and PostgreSQL and falls back to the ORM elsewhere.
+    """
+    if not rows:
+        return
+
+    table = CounterpartyEdge.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.address, table.c.counterparty],
+            set_={
+                "tx_count": table.c.tx_count + stmt.excluded.tx_count,
+                "volume": table.c.volume + stmt.excluded.volume,
+                "last_seen": case(
+                    (stmt.excluded.last_seen > table.c.last_seen, stmt.excluded.last_seen),
+                    else_=table.c.last_seen
+                ),
+            }
+        )
+        db.execute(stmt, rows)
+        return
+
+    for row in rows:
+        edge = db.get(CounterpartyEdge, (row["address"], row["counterparty"]))
+        if edge is None:
+            db.add(CounterpartyEdge(**row))
+        else:
+            edge.tx_count += row["tx_count"]
+            edge.volume += row["volume"]
+            edge.last_seen = max(edge.last_seen, row["last_seen"])
+    db.flush()
+
+
+def record_transfer(db: Session, transaction: Transaction, only: Optional[str] = None):
+    """
+    Update both counterparty edges of a transfer.
+    Call before committing the transaction so the index commits with it.
+
+    Args:
+        db: Database session holding the transaction
+        transaction: Completed transaction
+        only: Update just the edge of this address (a sharded transfer indexes
+            each side on the shard that owns it)
+    """
+    rows = _edge_rows(
+        transaction.sender_address,
+        transaction.recipient_address,
+        transaction.amount,
+        transaction.timestamp or datetime.utcnow()
+    )
+    _upsert_edges(db, [row for row in rows if only is None or row["address"] == only])
+
+
+def _in_range(column, low: Optional[str], high: Optional[str]):
+    """column in [low, high); None leaves that side open"""
+    return and_(
+        column >= low if low is not None else true(),
+        column < high if high is not None else true(),
+    )
+
+
+def backfill_statement(low: Optional[str] = None, high: Optional[str] = None):
+    """
+    Set-based INSERT ... SELECT that builds the index from the ledger.
+    Used by the schema migration that introduces the table (whole index) and
+    by rebuild_counterparties() (one address range at a time).
+
+    Only addresses with a wallet in this database get edges, and a sender's
+    edge already counts while its transfer is pending, which matches what
+    the send paths record on a shard as well as on a single database.
+
+    Args:
+        low: Only build edges of addresses >= low
+        high: Only build edges of addresses < high
+    """
+    local = select(Wallet.address)
+    directed = select(
+        Transaction.sender_address.label("address"),
+        Transaction.recipient_address.label("counterparty"),
+        Transaction.amount,
+        Transaction.timestamp,
+    ).where(
+        Transaction.status.in_(DEBITED_STATUSES),
+        _in_range(Transaction.sender_address, low, high),
+        Transaction.sender_address.in_(local)
+    ).union_all(
+        select(
+            Transaction.recipient_address,
+            Transaction.sender_address,
+            Transaction.amount,
+            Transaction.timestamp,
+        ).where(
+            Transaction.status == "completed",
+            Transaction.sender_address != Transaction.recipient_address,
+            _in_range(Transaction.recipient_address, low, high),
+            Transaction.recipient_address.in_(local)
+        )
+    ).subquery()
+
+    aggregated = select(
+        directed.c.address,
+        directed.c.counterparty,
+        func.count(),
+        func.sum(directed.c.amount),
+        func.max(directed.c.timestamp),
+    ).group_by(directed.c.address, directed.c.counterparty)
+
+    return insert(CounterpartyEdge).from_select(
+        ["address", "counterparty", "tx_count", "volume", "last_seen"], aggregated
+    )
+
+
+def rebuild_counterparties(chunk_size: int = 10000) -> dict:
+    """
+    Rebuild the counterparty index from the transactions ledger.
+
+    Wallet addresses are split into ranges of chunk_size wallets (the first
+    and last range are open-ended, so stale edges outside the wallet address
+    span are cleared too). Each range is deleted and rebuilt in one transaction, so
+    readers see either its old or its new edges, never an empty or partial
+    ranking, and transfers committed meanwhile are counted exactly once.
+
+    Args:
+        chunk_size: Wallet addresses per range
+
+    Returns:
+        dict: chunks, edges and duration_seconds
+    """
+    started = time.perf_counter()
+    chunks = 0
+
+    with session_scope() as db:
+        addresses = [address for (address,) in db.execute(select(Wallet.address).order_by(Wallet.address))]
+        db.commit()
+        bounds = [None] + addresses[chunk_size::chunk_size] + [None]
+
+        for low, high in zip(bounds, bounds[1:]):
+            db.query(CounterpartyEdge).filter(
+                _in_range(CounterpartyEdge.address, low, high)
+            ).delete(synchronize_session=False)
+            db.execute(backfill_statement(low, high))
+            db.commit()
+            chunks += 1
+
+        edges = db.query(func.count()).select_from(CounterpartyEdge).scalar()
+
+    return {
+        "chunks": chunks,
+        "edges": edges,
+        "duration_seconds": time.perf_counter() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the counterparty index from the transactions ledger")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Wallet addresses per rebuilt range")
+    args = parser.parse_args()
+
+    result = rebuild_counterparties(args.chunk_size)
+    print(f"Rebuilt {result['edges']} edges in {result['chunks']} address ranges "
+          f"in {result['duration_seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
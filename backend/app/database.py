@@ -1,27 +1,41 @@
+from contextlib import contextmanager
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Iterator, Optional
+from app.config import get_settings
 
-# Load environment variables from .env file
-load_dotenv()
+# Create SessionLocal class - each instance will be a database session.
+# It is bound to the engine the first time get_engine() is called, so importing
+# this module never reads the environment or touches the database.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
-# Get database URL from environment or use default SQLite
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./wallet.db")
+# Create Base class for declarative models
+Base = declarative_base()
 
-# Create database engine
-# For SQLite, we need to set check_same_thread to False
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+_engine: Optional[Engine] = None
 
-# Create SessionLocal class - each instance will be a database session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create Base class for declarative models
-Base = declarative_base()
+def get_engine() -> Engine:
+    """
+    Return the process-wide database engine, creating it on first use.
+
+    Returns:
+        Engine: SQLAlchemy engine for the configured DATABASE_URL
+    """
+    global _engine
+    if _engine is None:
+        database_url = get_settings().database_url
+        # For SQLite, we need to set check_same_thread to False
+        _engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False} if "sqlite" in database_url else {}
+        )
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
 
 # Dependency to get database session
 def get_db():
@@ -29,8 +43,53 @@ def get_db():
     Dependency function that provides database session to route functions.
     Usage: def my_route(db: Session = Depends(get_db))
     """
+    get_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def session_scope():
+    """
+    Context manager that provides a database session outside of a request,
+    for background jobs and command line tools.
+    Usage: with session_scope() as db: ...
+    """
+    get_engine()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def wallet_session(address: str) -> Iterator[Session]:
+    """
+    Session on the database that holds a wallet's data: its shard when
+    SHARD_URLS is set, otherwise the DATABASE_URL database.
+    Usage: with wallet_session(address) as db: ...
+    """
+    from app.sharding import get_router
+
+    router = get_router()
+    if router is None:
+        with session_scope() as db:
+            yield db
+    else:
+        with router.session(address) as db:
+            yield db
+
+
+def get_wallet_db(request: Request):
+    """
+    Like get_db, but on the shard of the wallet named in the path
+    ({address} or {wallet_address}) when SHARD_URLS is set.
+    Usage: def my_route(address: str, db: Session = Depends(get_wallet_db))
+    """
+    params = request.path_params
+    with wallet_session(params.get("address") or params["wallet_address"]) as db:
+        yield db
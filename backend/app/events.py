@@ -0,0 +1,93 @@
+import asyncio
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, Optional
+from app.config import get_settings
+
+
+@dataclass(frozen=True)
+class TransactionEvent:
+    """A committed transaction, serialized once for every subscriber"""
+    id: int
+    sender_address: str
+    recipient_address: str
+    data: str
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One live stream's bounded buffer of pending events"""
+    address: str
+    queue: asyncio.Queue = field(repr=False)
+    overflowed: bool = False
+
+
+class TransactionStreams:
+    """
+    In-process publish/subscribe of committed transactions by wallet address.
+
+    The send path publishes after commit; each live stream holds a bounded
+    queue, so idle streams cost one queue and no database work. A stream
+    whose buffer fills up is ended and the client resumes from its
+    Last-Event-ID. Only streams served by the same worker process see an event.
+    """
+
+    def __init__(self, buffer_size: int = 100):
+        self.buffer_size = buffer_size
+        self._subscribers: dict[str, set[Subscription]] = {}
+
+    def subscribe(self, address: str) -> Subscription:
+        subscription = Subscription(address, asyncio.Queue(maxsize=self.buffer_size))
+        self._subscribers.setdefault(address, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.address)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.address]
+
+    def publish(self, event: TransactionEvent, addresses: Optional[Iterable[str]] = None):
+        """
+        Hand an event to every stream of its sender and recipient (or of the
+        given addresses only, e.g. one side of a cross-shard transfer, whose
+        ledger row has a different ID on each shard).
+        Must be called from the event loop thread.
+        """
+        if addresses is None:
+            addresses = {event.sender_address, event.recipient_address}
+        for address in addresses:
+            for subscription in self._subscribers.get(address, ()):
+                if subscription.overflowed:
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Drop the backlog and wake the stream so it can end
+                    subscription.overflowed = True
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.queue.put_nowait(None)
+
+    def stream_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def next_event(self, subscription: Subscription, timeout: float) -> Optional[TransactionEvent]:
+        """
+        Wait for the next event of a stream.
+
+        Returns:
+            Optional[TransactionEvent]: The event, or None if the stream overflowed
+
+        Raises:
+            asyncio.TimeoutError: If nothing arrived within timeout
+        """
+        return await asyncio.wait_for(subscription.queue.get(), timeout)
+
+
+@lru_cache(maxsize=1)
+def get_streams() -> TransactionStreams:
+    """Return the process-wide transaction stream registry"""
+    return TransactionStreams(buffer_size=get_settings().sse_buffer_size)
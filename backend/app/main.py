@@ -1,61 +1,78 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routers import wallet, transactions, notifications
-from app.auth import router as auth_router
-import json
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Mock Web3 Wallet API", version="1.0.0")
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
-app.include_router(wallet.router, prefix="/wallet", tags=["Wallet"])
-app.include_router(transactions.router, prefix="/transactions", tags=["Transactions"])
-app.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
-
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: dict[str, WebSocket] = {}
-
-    async def connect(self, wallet_address: str, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections[wallet_address] = websocket
-
-    def disconnect(self, wallet_address: str):
-        if wallet_address in self.active_connections:
-            del self.active_connections[wallet_address]
-
-    async def send_personal_message(self, message: str, wallet_address: str):
-        if wallet_address in self.active_connections:
-            await self.active_connections[wallet_address].send_text(message)
-
-manager = ConnectionManager()
-
-@app.websocket("/ws/{wallet_address}")
+from importlib import import_module
+from app.config import get_settings
+from app.database import get_engine
+import asyncio
+
+# Routers are imported when the app is built rather than when this module is
+# imported: (module path, URL prefix, OpenAPI tags)
+ROUTERS = [
+    ("app.auth", "/auth", ["Authentication"]),
+    ("app.routers.wallet", "/wallet", ["Wallet"]),
+    ("app.routers.transactions", "/transactions", ["Transactions"]),
+    ("app.routers.notifications", "/notifications", ["Notifications"]),
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup and shutdown.
+    Checks the schema version (creating or upgrading tables only when needed)
+    and runs the background maintenance jobs while the app is serving.
+    With SHARD_URLS set, the jobs run on every shard; the DATABASE_URL
+    database still holds their leases.
+    """
+    from app.connections import get_manager
+    from app.retention import compact_notifications
+    from app.schema import ensure_schema
+    from app.sharding import get_router, on_each_shard, recover_all
+    from app.snapshots import take_snapshots
+    from app.tasks import run_periodic
+
+    settings = get_settings()
+    ensure_schema(get_engine())
+    router = get_router()
+    if router is not None:
+        router.ensure_schemas()
+
+    def on_storage(job):
+        return job if router is None else partial(on_each_shard, job)
+
+    background = []
+    if settings.compaction_interval_seconds:
+        background.append(asyncio.create_task(run_periodic(
+            "notification compaction", settings.compaction_interval_seconds, on_storage(compact_notifications)
+        )))
+    if settings.snapshot_interval_seconds:
+        background.append(asyncio.create_task(run_periodic(
+            "balance snapshots", settings.snapshot_interval_seconds, on_storage(take_snapshots)
+        )))
+    if router is not None and settings.shard_recovery_interval_seconds:
+        background.append(asyncio.create_task(run_periodic(
+            "shard transfer recovery", settings.shard_recovery_interval_seconds, recover_all
+        )))
+    if settings.ws_idle_timeout_seconds:
+        background.append(asyncio.create_task(
+            get_manager().run_reaper(settings.ws_reap_interval_seconds)
+        ))
+
+    yield
+
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+
+
 async def websocket_endpoint(websocket: WebSocket, wallet_address: str):
-    await manager.connect(wallet_address, websocket)
-    try:
-        while True:
-            data = await websocket.receive_text()
-            # Echo back for heartbeat
-            await websocket.send_text(json.dumps({"type": "pong"}))
-    except WebSocketDisconnect:
-        manager.disconnect(wallet_address)
-
-@app.get("/")
+    from app.connections import get_manager
+
+    await get_manager().serve(wallet_address, websocket)
+
+
 async def root():
     return {
         "message": "Mock Web3 Wallet API",
@@ -63,6 +80,63 @@ async def root():
         "docs": "/docs"
     }
 
-@app.get("/health")
+
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+async def metrics():
+    from app.connections import get_manager
+    from app.events import get_streams
+    from app.singleflight import get_flight
+
+    return {
+        "singleflight": get_flight().stats(),
+        "transaction_streams": get_streams().stream_count(),
+        "websockets": get_manager().stats(),
+    }
+
+
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application from the process-wide settings (get_settings()).
+
+    Returns:
+        FastAPI: Configured application
+    """
+    settings = get_settings()
+
+    app = FastAPI(title="Mock Web3 Wallet API", version="1.0.0", lifespan=lifespan)
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(settings.cors_origins),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Lets the browser read the notification pagination cursor
+        expose_headers=["X-Next-Cursor"],
+    )
+
+    # Include routers
+    for module_path, prefix, tags in ROUTERS:
+        module = import_module(module_path)
+        app.include_router(module.router, prefix=prefix, tags=tags)
+
+    app.add_api_websocket_route("/ws/{wallet_address}", websocket_endpoint)
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/health", health_check, methods=["GET"])
+    app.add_api_route("/metrics", metrics, methods=["GET"])
+
+    return app
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` looks the app up as a module attribute; build it on
+    # first access so importing app.main stays cheap for tools and tests.
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,31 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+import secrets
+
+# Balance every new or imported wallet starts with, in ETH
+INITIAL_BALANCE = 3.34
+
+# Ledger rows whose amount has left the sender's balance. A cross-shard
+# transfer debits the sender while "pending"; the recipient is credited by a
+# separate "completed" row on its own shard (see app/sharding.py). Credits
+# therefore only count for "completed" rows.
+DEBITED_STATUSES = ("pending", "completed")
+
+
+def generate_transaction_hash() -> str:
+    """
+    Generate a mock transaction hash.
+    Format: 0x followed by 64 hexadecimal characters
+
+    Returns:
+        str: Mock transaction hash
+    """
+    random_bytes = secrets.token_bytes(32)  # 32 bytes = 64 hex characters
+    tx_hash = "0x" + random_bytes.hex()
+    return tx_hash
+
 
 class Wallet(Base):
     """Wallet model - stores wallet information"""
@@ -10,7 +34,7 @@ class Wallet(Base):
     id = Column(Integer, primary_key=True, index=True)
     address = Column(String, unique=True, index=True, nullable=False)
     private_key = Column(String, nullable=False)  # In production, encrypt this!
-    balance = Column(Float, default=3.34)  # Initial balance in ETH
+    balance = Column(Float, default=INITIAL_BALANCE)  # Initial balance in ETH
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -51,6 +75,12 @@ class Transaction(Base):
         back_populates="transactions_received"
     )
 
+    __table_args__ = (
+        # Point-in-time balance replay reads a wallet's transfers in a time range
+        Index("ix_transactions_sender_timestamp", "sender_address", "timestamp"),
+        Index("ix_transactions_recipient_timestamp", "recipient_address", "timestamp"),
+    )
+
 
 class Notification(Base):
     """Notification model - stores user notifications"""
@@ -64,4 +94,93 @@ class Notification(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
-    wallet = relationship("Wallet", back_populates="notifications")
\ No newline at end of file
+    wallet = relationship("Wallet", back_populates="notifications")
+
+    __table_args__ = (
+        # Serves per-wallet listing and the unread counter without a table scan
+        Index("ix_notifications_wallet_read_created", "wallet_address", "read", "created_at"),
+    )
+
+
+class SchemaVersion(Base):
+    """Schema version model - records the schema version the database was built for"""
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JobLease(Base):
+    """Job lease model - the process currently entitled to run a periodic job"""
+    __tablename__ = "job_leases"
+
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)  # hostname:pid
+    expires_at = Column(DateTime, nullable=False)
+
+
+class CounterpartyEdge(Base):
+    """Counterparty edge model - running totals of transfers between a wallet and one counterparty"""
+    __tablename__ = "counterparty_edges"
+
+    address = Column(String, ForeignKey("wallets.address"), primary_key=True)
+    counterparty = Column(String, ForeignKey("wallets.address"), primary_key=True)
+    tx_count = Column(Integer, nullable=False, default=0)  # Transfers in either direction
+    volume = Column(Float, nullable=False, default=0.0)  # Total amount in either direction
+    last_seen = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Top-K counterparties of a wallet are read straight off these indexes
+        Index("ix_counterparty_edges_address_count", "address", "tx_count"),
+        Index("ix_counterparty_edges_address_volume", "address", "volume"),
+    )
+
+
+
+class LedgerCheckpoint(Base):
+    """Ledger checkpoint model - a verified reconciliation of balances against the ledger"""
+    __tablename__ = "ledger_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    last_transaction_id = Column(Integer, nullable=False)  # Ledger replayed up to this ID
+    wallet_count = Column(Integer, nullable=False, default=0)
+    drifted_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)  # Set once all balances are written
+
+
+class CheckpointBalance(Base):
+    """Checkpoint balance model - ledger-derived balance of one wallet at a checkpoint"""
+    __tablename__ = "checkpoint_balances"
+
+    checkpoint_id = Column(Integer, ForeignKey("ledger_checkpoints.id"), primary_key=True)
+    address = Column(String, primary_key=True)
+    balance = Column(Float, nullable=False)
+
+
+class TransferCredit(Base):
+    """Transfer credit model - marks a cross-shard transfer as credited on the recipient's shard"""
+    __tablename__ = "transfer_credits"
+
+    transaction_hash = Column(String, primary_key=True)
+    recipient_address = Column(String, nullable=False)
+    amount = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BalanceSnapshot(Base):
+    """Balance snapshot model - a wallet's balance as of a point in the ledger"""
+    __tablename__ = "balance_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    address = Column(String, ForeignKey("wallets.address"), nullable=False)
+    balance = Column(Float, nullable=False)
+    last_transaction_id = Column(Integer, nullable=False)  # Ledger included up to this ID
+    last_transaction_at = Column(DateTime, nullable=True)  # Timestamp of that transaction
+    taken_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_balance_snapshots_address_taken", "address", "taken_at"),
+        Index("ix_balance_snapshots_address_position", "address", "last_transaction_id"),
+    )
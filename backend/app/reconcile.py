@@ -0,0 +1,262 @@
+"""
+Ledger reconciliation.
+
+Checks that every Wallet.balance equals its opening balance plus its net flow
+in the transactions ledger. The ledger is streamed in columnar chunks into
+NumPy arrays and net flow is computed per address code with bincount, so a run
+costs a few vectorized passes rather than a Python loop per row. Each run
+writes a checkpoint of ledger-derived balances; the next run starts from it
+and only replays transactions added since. Sharded databases are reconciled
+one shard at a time; the other side of a cross-shard transfer is reported
+as a reference to a wallet not in this database.
+
+Run from the backend directory:
+    python -m app.reconcile [--full] [--chunk-size 100000] [--tolerance 1e-6]
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.database import session_scope
+from app.models import DEBITED_STATUSES, INITIAL_BALANCE, CheckpointBalance, LedgerCheckpoint, Transaction, Wallet
+
+
+@dataclass
+class Drift:
+    """A wallet whose stored balance disagrees with the ledger"""
+    address: str
+    expected: float
+    actual: float
+
+    @property
+    def difference(self) -> float:
+        return self.actual - self.expected
+
+
+@dataclass
+class ReconciliationReport:
+    """Outcome of one reconciliation run"""
+    checkpoint_id: Optional[int] = None
+    base_checkpoint_id: Optional[int] = None
+    last_transaction_id: int = 0
+    wallets: int = 0
+    transactions_replayed: int = 0
+    unknown_addresses: int = 0
+    drifted: list[Drift] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+
+def _codes(addresses: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Map addresses to their index in the sorted address array.
+
+    Returns:
+        tuple: (codes, known) where known flags addresses present in the array
+    """
+    codes = np.searchsorted(addresses, values)
+    codes[codes == len(addresses)] = 0
+    known = addresses[codes] == values if len(addresses) else np.zeros(len(values), dtype=bool)
+    return codes, known
+
+
+def _load_baseline(db: Session, checkpoint: Optional[LedgerCheckpoint], addresses: np.ndarray,
+                   chunk_size: int) -> np.ndarray:
+    """Ledger-derived balances at the checkpoint (opening balance for wallets it doesn't cover)"""
+    baseline = np.full(len(addresses), INITIAL_BALANCE, dtype=np.float64)
+    if checkpoint is None:
+        return baseline
+
+    result = db.execute(
+        select(CheckpointBalance.address, CheckpointBalance.balance).where(
+            CheckpointBalance.checkpoint_id == checkpoint.id
+        ).execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        chunk_addresses, chunk_balances = zip(*rows)
+        codes, known = _codes(addresses, np.array(chunk_addresses, dtype=str))
+        baseline[codes[known]] = np.array(chunk_balances, dtype=np.float64)[known]
+    return baseline
+
+
+def _confirm(db: Session, candidates: list[Drift], last_transaction_id: int, tolerance: float) -> list[Drift]:
+    """
+    Re-check drift candidates against the live ledger, so transfers that
+    committed while balances were being read are not reported as drift.
+    """
+    confirmed = []
+    for candidate in candidates:
+        balance = db.query(Wallet.balance).filter(Wallet.address == candidate.address).scalar()
+        received = db.query(func.coalesce(func.sum(Transaction.amount), 0.0)).filter(
+            Transaction.recipient_address == candidate.address,
+            Transaction.id > last_transaction_id,
+            Transaction.status == "completed"
+        ).scalar()
+        sent = db.query(func.coalesce(func.sum(Transaction.amount), 0.0)).filter(
+            Transaction.sender_address == candidate.address,
+            Transaction.id > last_transaction_id,
+            Transaction.status.in_(DEBITED_STATUSES)
+        ).scalar()
+        db.commit()
+
+        expected = candidate.expected + received - sent
+        if balance is not None and abs(balance - expected) > tolerance:
+            confirmed.append(Drift(address=candidate.address, expected=expected, actual=balance))
+    return confirmed
+
+
+def _write_checkpoint(db: Session, report: ReconciliationReport, addresses: np.ndarray,
+                      expected: np.ndarray, chunk_size: int) -> int:
+    """Store ledger-derived balances and drop the balances of older checkpoints"""
+    checkpoint = LedgerCheckpoint(
+        last_transaction_id=report.last_transaction_id,
+        wallet_count=report.wallets,
+        drifted_count=len(report.drifted),
+    )
+    db.add(checkpoint)
+    db.commit()
+
+    for start in range(0, len(addresses), chunk_size):
+        db.execute(insert(CheckpointBalance), [
+            {"checkpoint_id": checkpoint.id, "address": address, "balance": balance}
+            for address, balance in zip(
+                addresses[start:start + chunk_size].tolist(), expected[start:start + chunk_size].tolist()
+            )
+        ])
+        db.commit()
+
+    # Only a fully written checkpoint is used as a baseline
+    checkpoint.completed_at = datetime.utcnow()
+    db.query(CheckpointBalance).filter(
+        CheckpointBalance.checkpoint_id != checkpoint.id
+    ).delete(synchronize_session=False)
+    db.commit()
+    return checkpoint.id
+
+
+def reconcile(full: bool = False, chunk_size: int = 100000, tolerance: float = 1e-6,
+              write_checkpoint: bool = True) -> ReconciliationReport:
+    """
+    Compare wallet balances with the ledger.
+
+    Args:
+        full: Replay the whole ledger instead of starting at the last checkpoint
+        chunk_size: Rows per streamed chunk
+        tolerance: Largest absolute difference not reported as drift
+        write_checkpoint: Store a new checkpoint for the next run
+
+    Returns:
+        ReconciliationReport: Drifted wallets and run statistics
+    """
+    started = time.perf_counter()
+    report = ReconciliationReport()
+
+    with session_scope() as db:
+        checkpoint = None
+        if not full:
+            checkpoint = db.query(LedgerCheckpoint).filter(
+                LedgerCheckpoint.completed_at.isnot(None)
+            ).order_by(LedgerCheckpoint.id.desc()).first()
+        report.base_checkpoint_id = checkpoint.id if checkpoint else None
+        after_id = checkpoint.last_transaction_id if checkpoint else 0
+
+        # Fix the replay boundary, then read balances; transfers committing in
+        # between are ruled out by _confirm() below
+        report.last_transaction_id = db.query(func.max(Transaction.id)).scalar() or 0
+        wallet_rows = db.execute(select(Wallet.address, Wallet.balance)).all()
+        db.commit()
+
+        if wallet_rows:
+            wallet_addresses, wallet_balances = zip(*wallet_rows)
+        else:
+            wallet_addresses, wallet_balances = (), ()
+        addresses = np.array(wallet_addresses, dtype=str)
+        order = np.argsort(addresses)
+        addresses = addresses[order]
+        actual = np.array(wallet_balances, dtype=np.float64)[order]
+        report.wallets = len(addresses)
+
+        expected = _load_baseline(db, checkpoint, addresses, chunk_size)
+
+        result = db.execute(
+            select(
+                Transaction.sender_address,
+                Transaction.recipient_address,
+                Transaction.amount,
+                Transaction.status,
+            ).where(
+                Transaction.id > after_id,
+                Transaction.id <= report.last_transaction_id,
+                Transaction.status.in_(DEBITED_STATUSES)
+            ).execution_options(yield_per=chunk_size)
+        )
+        for rows in result.partitions():
+            senders, recipients, amounts, statuses = zip(*rows)
+            amounts = np.array(amounts, dtype=np.float64)
+            sender_codes, sender_known = _codes(addresses, np.array(senders, dtype=str))
+            recipient_codes, recipient_known = _codes(addresses, np.array(recipients, dtype=str))
+            # Pending (cross-shard) rows have debited the sender but not credited anyone here
+            credited = recipient_known & (np.array(statuses, dtype=str) == "completed")
+
+            expected -= np.bincount(
+                sender_codes[sender_known], weights=amounts[sender_known], minlength=len(addresses)
+            )
+            expected += np.bincount(
+                recipient_codes[credited], weights=amounts[credited], minlength=len(addresses)
+            )
+            report.unknown_addresses += int((~sender_known).sum() + (~recipient_known).sum())
+            report.transactions_replayed += len(amounts)
+        db.commit()
+
+        drifted = np.flatnonzero(np.abs(actual - expected) > tolerance)
+        report.drifted = _confirm(db, [
+            Drift(address=str(addresses[i]), expected=float(expected[i]), actual=float(actual[i]))
+            for i in drifted
+        ], report.last_transaction_id, tolerance)
+
+        if write_checkpoint:
+            report.checkpoint_id = _write_checkpoint(db, report, addresses, expected, chunk_size)
+
+    report.duration_seconds = time.perf_counter() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile wallet balances against the transactions ledger")
+    parser.add_argument("--full", action="store_true", help="Ignore checkpoints and replay the whole ledger")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Rows per streamed chunk")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="Allowed absolute difference")
+    parser.add_argument("--no-checkpoint", action="store_true", help="Do not write a new checkpoint")
+    parser.add_argument("--max-report", type=int, default=50, help="Drifted wallets to print")
+    args = parser.parse_args()
+
+    report = reconcile(
+        full=args.full,
+        chunk_size=args.chunk_size,
+        tolerance=args.tolerance,
+        write_checkpoint=not args.no_checkpoint,
+    )
+
+    base = f"checkpoint {report.base_checkpoint_id}" if report.base_checkpoint_id else "the start of the ledger"
+    print(f"Replayed {report.transactions_replayed} transactions from {base} "
+          f"up to ID {report.last_transaction_id} for {report.wallets} wallets "
+          f"in {report.duration_seconds:.2f}s")
+    if report.unknown_addresses:
+        print(f"Ledger references to wallets not in this database: {report.unknown_addresses}")
+    if report.checkpoint_id:
+        print(f"Wrote checkpoint {report.checkpoint_id}")
+
+    print(f"Drifted wallets: {len(report.drifted)}")
+    for drift in report.drifted[:args.max_report]:
+        print(f"  {drift.address} expected={drift.expected:.9f} actual={drift.actual:.9f} "
+              f"diff={drift.difference:+.9f}")
+
+    sys.exit(1 if report.drifted else 0)
+
+
+if __name__ == "__main__":
+    main()
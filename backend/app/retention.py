@@ -0,0 +1,236 @@
+"""
+Notification retention and compaction.
+
+Deletes notifications that fall outside the retention policy in bounded
+batches, each committed on its own so the SQLite writer lock is only held for
+one batch at a time. Deleted rows can be archived to gzip-compressed NDJSON.
+
+Run once from the backend directory:
+    python -m app.retention
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, Optional
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from app.config import Settings, get_settings
+from app.database import session_scope
+from app.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Which notifications to keep (no rule deletes anything by default)"""
+    max_age: Optional[timedelta] = None
+    max_per_wallet: Optional[int] = None
+    keep_unread: bool = True
+    batch_size: int = 1000
+    archive_dir: Optional[str] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RetentionPolicy":
+        return cls(
+            max_age=timedelta(days=settings.notification_max_age_days)
+            if settings.notification_max_age_days else None,
+            max_per_wallet=settings.notification_max_per_wallet,
+            keep_unread=settings.notification_keep_unread,
+            batch_size=settings.compaction_batch_size,
+            archive_dir=settings.notification_archive_dir,
+        )
+
+
+@dataclass
+class CompactionReport:
+    """Outcome of one compaction run"""
+    expired: int = 0
+    over_limit: int = 0
+    archived: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+    archive_path: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def deleted(self) -> int:
+        return self.expired + self.over_limit
+
+
+def _serialize(notification: Notification) -> str:
+    return json.dumps({
+        "id": notification.id,
+        "wallet_address": notification.wallet_address,
+        "message": notification.message,
+        "type": notification.type,
+        "read": notification.read,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+    })
+
+
+class _Compactor:
+    """Deletes (and optionally archives) notifications one batch per transaction"""
+
+    def __init__(self, policy: RetentionPolicy, report: CompactionReport):
+        self.policy = policy
+        self.report = report
+        self.archive = None
+
+    def write_archive(self, rows: list[Notification]):
+        # Opened on first use so runs that delete nothing leave no empty file
+        if self.archive is None:
+            self.open_archive()
+        self.archive.write("".join(_serialize(row) + "\n" for row in rows))
+        self.archive.flush()
+        self.report.archived += len(rows)
+
+    def open_archive(self):
+        os.makedirs(self.policy.archive_dir, exist_ok=True)
+        stamp = self.report.started_at.strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(self.policy.archive_dir, f"notifications-{stamp}.ndjson.gz")
+        self.archive = gzip.open(path, "at", encoding="utf-8")
+        self.report.archive_path = path
+
+    def close_archive(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    def drain(self, db: Session, *criteria) -> int:
+        """
+        Delete every notification matching criteria, batch by batch.
+
+        Returns:
+            int: Number of notifications deleted
+        """
+        deleted = 0
+        while True:
+            if self.policy.archive_dir:
+                rows = db.query(Notification).filter(*criteria).order_by(Notification.id).limit(
+                    self.policy.batch_size
+                ).all()
+                ids = [row.id for row in rows]
+            else:
+                rows = []
+                ids = [
+                    row.id for row in db.query(Notification.id).filter(*criteria).order_by(
+                        Notification.id
+                    ).limit(self.policy.batch_size)
+                ]
+            if not ids:
+                db.rollback()
+                return deleted
+
+            if rows:
+                self.write_archive(rows)
+
+            db.query(Notification).filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+            # Commit per batch so the writer lock is released between batches
+            db.commit()
+            db.expunge_all()
+            deleted += len(ids)
+            self.report.batches += 1
+
+    def expire(self, db: Session, now: datetime):
+        criteria = [Notification.created_at < now - self.policy.max_age]
+        if self.policy.keep_unread:
+            criteria.append(Notification.read == True)  # noqa: E712
+        self.report.expired += self.drain(db, *criteria)
+
+    def trim(self, db: Session):
+        limit = self.policy.max_per_wallet
+        wallets = [
+            row.wallet_address for row in db.query(Notification.wallet_address).group_by(
+                Notification.wallet_address
+            ).having(func.count(Notification.id) > limit)
+        ]
+        for wallet_address in wallets:
+            # Newest notification that still fits within the limit
+            boundary = db.query(Notification.created_at, Notification.id).filter(
+                Notification.wallet_address == wallet_address
+            ).order_by(Notification.created_at.desc(), Notification.id.desc()).offset(limit - 1).first()
+            if boundary is None:
+                continue
+            criteria = [
+                Notification.wallet_address == wallet_address,
+                or_(
+                    Notification.created_at < boundary.created_at,
+                    and_(Notification.created_at == boundary.created_at, Notification.id < boundary.id)
+                ),
+            ]
+            if self.policy.keep_unread:
+                criteria.append(Notification.read == True)  # noqa: E712
+            self.report.over_limit += self.drain(db, *criteria)
+
+
+def compact_notifications(policy: Optional[RetentionPolicy] = None,
+                          session: Callable[[], ContextManager[Session]] = session_scope) -> CompactionReport:
+    """
+    Apply the retention policy to the notifications table.
+
+    Args:
+        policy: Retention policy (defaults to the configured one)
+        session: Opens the session of the database to compact (defaults to DATABASE_URL)
+
+    Returns:
+        CompactionReport: Rows reclaimed and run time
+    """
+    policy = policy or RetentionPolicy.from_settings(get_settings())
+    report = CompactionReport()
+    started = time.perf_counter()
+    compactor = _Compactor(policy, report)
+
+    try:
+        with session() as db:
+            if policy.max_age is not None:
+                compactor.expire(db, report.started_at)
+            if policy.max_per_wallet:
+                compactor.trim(db)
+    finally:
+        compactor.close_archive()
+
+    report.duration_seconds = time.perf_counter() - started
+    logger.info(
+        "Notification compaction deleted %d rows (%d expired, %d over limit, %d archived) "
+        "in %d batches, %.2fs",
+        report.deleted, report.expired, report.over_limit, report.archived,
+        report.batches, report.duration_seconds,
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the notification retention policy once")
+    parser.add_argument("--max-age-days", type=int, help="Override NOTIFICATION_MAX_AGE_DAYS (0 disables)")
+    parser.add_argument("--max-per-wallet", type=int, help="Override NOTIFICATION_MAX_PER_WALLET (0 disables)")
+    parser.add_argument("--archive-dir", help="Override NOTIFICATION_ARCHIVE_DIR")
+    parser.add_argument("--batch-size", type=int, help="Override COMPACTION_BATCH_SIZE")
+    args = parser.parse_args()
+
+    policy = RetentionPolicy.from_settings(get_settings())
+    overrides = {}
+    if args.max_age_days is not None:
+        overrides["max_age"] = timedelta(days=args.max_age_days) if args.max_age_days else None
+    if args.max_per_wallet is not None:
+        overrides["max_per_wallet"] = args.max_per_wallet or None
+    if args.archive_dir is not None:
+        overrides["archive_dir"] = args.archive_dir
+    if args.batch_size is not None:
+        overrides["batch_size"] = args.batch_size
+    policy = replace(policy, **overrides)
+
+    report = compact_notifications(policy)
+    print(f"Deleted {report.deleted} notifications "
+          f"({report.expired} expired, {report.over_limit} over per-wallet limit)")
+    print(f"Archived {report.archived} rows" + (f" to {report.archive_path}" if report.archive_path else ""))
+    print(f"{report.batches} batches in {report.duration_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
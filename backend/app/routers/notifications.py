@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from app.database import get_db
+from datetime import datetime, timezone
+from typing import Optional
+import base64
+from app.database import get_db, get_wallet_db, wallet_session
 from app.models import Notification
+from app.sharding import get_router
 
 # Create router instance
 router = APIRouter()
@@ -27,23 +32,127 @@ class NotificationCreate(BaseModel):
     type: str  # success, error, info, warning
 
 
+class UnreadCountResponse(BaseModel):
+    """Schema for unread notification count response"""
+    wallet_address: str
+    unread: int
+
+
+class BulkUpdateResponse(BaseModel):
+    """Schema for bulk update/delete response"""
+    wallet_address: str
+    affected: int
+
+
+# ===== Helper Functions =====
+
+def encode_cursor(notification: Notification) -> str:
+    """
+    Encode the keyset position of a notification as an opaque cursor.
+    The cursor carries (created_at, id) itself, so it stays valid after the
+    notification is deleted.
+    """
+    position = f"{notification.created_at.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    created_at, notification_id = position.split("|")
+    return datetime.fromisoformat(created_at), int(notification_id)
+
+
+def get_notification_db(
+    wallet_address: Optional[str] = Query(None, description="Owner of the notification (required with sharding)")
+):
+    """
+    Session for the routes that address one notification by ID.
+    Notification IDs are per shard, so with SHARD_URLS set the owner picks the shard.
+    """
+    if wallet_address is not None:
+        with wallet_session(wallet_address) as db:
+            yield db
+    elif get_router() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="wallet_address is required when sharding is enabled"
+        )
+    else:
+        yield from get_db()
+
+
+def _find_notification(db: Session, notification_id: int, wallet_address: Optional[str]) -> Notification:
+    """Load a notification by ID (and owner, if given)"""
+    query = db.query(Notification).filter(Notification.id == notification_id)
+    if wallet_address is not None:
+        query = query.filter(Notification.wallet_address == wallet_address)
+    notification = query.first()
+
+    if not notification:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    return notification
+
+
 # ===== API Routes =====
 
 @router.get("/{wallet_address}", response_model=list[NotificationResponse])
-async def get_wallet_notifications(wallet_address: str, db: Session = Depends(get_db)):
+async def get_wallet_notifications(
+    wallet_address: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Maximum notifications to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
+    db: Session = Depends(get_wallet_db)
+):
     """
-    Get all notifications for a wallet address.
+    Get notifications for a wallet address, newest first.
+    Without a limit all notifications are returned. When a page is full, the
+    X-Next-Cursor response header holds the cursor for the next page.
 
     Args:
         wallet_address: Wallet address
+        response: Response (for the pagination header)
+        limit: Optional page size
+        cursor: Optional cursor from the previous page
         db: Database session
 
     Returns:
         list[NotificationResponse]: List of notifications
+
+    Raises:
+        HTTPException: If cursor is malformed
     """
-    notifications = db.query(Notification).filter(
-        Notification.wallet_address == wallet_address
-    ).order_by(Notification.created_at.desc()).all()
+    query = db.query(Notification).filter(Notification.wallet_address == wallet_address)
+
+    if cursor is not None:
+        try:
+            last_created_at, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        # Keyset pagination on (created_at, id) so pages stay stable under inserts and deletes
+        query = query.filter(or_(
+            Notification.created_at < last_created_at,
+            and_(Notification.created_at == last_created_at, Notification.id < last_id)
+        ))
+
+    query = query.order_by(Notification.created_at.desc(), Notification.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    notifications = query.all()
+
+    if limit is not None and len(notifications) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(notifications[-1])
 
     return [
         NotificationResponse(
@@ -58,13 +167,60 @@ async def get_wallet_notifications(wallet_address: str, db: Session = Depends(ge
     ]
 
 
+@router.get("/{wallet_address}/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(wallet_address: str, db: Session = Depends(get_wallet_db)):
+    """
+    Count unread notifications for a wallet address.
+    Answered from the (wallet_address, read, created_at) index.
+
+    Args:
+        wallet_address: Wallet address
+        db: Database session
+
+    Returns:
+        UnreadCountResponse: Number of unread notifications
+    """
+    unread = db.query(func.count(Notification.id)).filter(
+        Notification.wallet_address == wallet_address,
+        Notification.read == False  # noqa: E712
+    ).scalar()
+
+    return UnreadCountResponse(wallet_address=wallet_address, unread=unread)
+
+
+@router.put("/{wallet_address}/read-all", response_model=BulkUpdateResponse)
+async def mark_all_notifications_read(wallet_address: str, db: Session = Depends(get_wallet_db)):
+    """
+    Mark every unread notification of a wallet as read in one statement.
+
+    Args:
+        wallet_address: Wallet address
+        db: Database session
+
+    Returns:
+        BulkUpdateResponse: Number of notifications marked as read
+    """
+    affected = db.query(Notification).filter(
+        Notification.wallet_address == wallet_address,
+        Notification.read == False  # noqa: E712
+    ).update({Notification.read: True}, synchronize_session=False)
+    db.commit()
+
+    return BulkUpdateResponse(wallet_address=wallet_address, affected=affected)
+
+
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
-async def mark_notification_read(notification_id: int, db: Session = Depends(get_db)):
+async def mark_notification_read(
+    notification_id: int,
+    wallet_address: Optional[str] = None,
+    db: Session = Depends(get_notification_db)
+):
     """
     Mark a notification as read.
 
     Args:
         notification_id: Notification ID
+        wallet_address: Optional owner of the notification (required with sharding)
         db: Database session
 
     Returns:
@@ -73,13 +229,7 @@ async def mark_notification_read(notification_id: int, db: Session = Depends(get
     Raises:
         HTTPException: If notification not found
     """
-    notification = db.query(Notification).filter(Notification.id == notification_id).first()
-
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
-        )
+    notification = _find_notification(db, notification_id, wallet_address)
 
     notification.read = True
     db.commit()
@@ -96,13 +246,12 @@ async def mark_notification_read(notification_id: int, db: Session = Depends(get
 
 
 @router.post("/", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
-async def create_notification(notification_data: NotificationCreate, db: Session = Depends(get_db)):
+async def create_notification(notification_data: NotificationCreate):
     """
     Create a new notification.
 
     Args:
         notification_data: Notification details
-        db: Database session
 
     Returns:
         NotificationResponse: Created notification
@@ -113,9 +262,10 @@ async def create_notification(notification_data: NotificationCreate, db: Session
         type=notification_data.type
     )
 
-    db.add(notification)
-    db.commit()
-    db.refresh(notification)
+    with wallet_session(notification_data.wallet_address) as db:
+        db.add(notification)
+        db.commit()
+        db.refresh(notification)
 
     return NotificationResponse(
         id=notification.id,
@@ -127,27 +277,69 @@ async def create_notification(notification_data: NotificationCreate, db: Session
     )
 
 
-@router.delete("/{notification_id}")
-async def delete_notification(notification_id: int, db: Session = Depends(get_db)):
+@router.delete("/{notification_id:int}")
+async def delete_notification(
+    notification_id: int,
+    wallet_address: Optional[str] = None,
+    db: Session = Depends(get_notification_db)
+):
     """
     Delete a notification.
 
     Args:
         notification_id: Notification ID
+        wallet_address: Optional owner of the notification (required with sharding)
         db: Database session
 
     Raises:
         HTTPException: If notification not found
     """
-    notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    notification = _find_notification(db, notification_id, wallet_address)
 
-    if not notification:
+    db.delete(notification)
+    db.commit()
+
+    return {"message": "Notification deleted successfully"}
+
+
+@router.delete("/{wallet_address}", response_model=BulkUpdateResponse)
+async def delete_wallet_notifications(
+    wallet_address: str,
+    ids: Optional[list[int]] = Query(None, description="Notification IDs to delete"),
+    older_than: Optional[datetime] = Query(None, description="Delete notifications created before this time"),
+    db: Session = Depends(get_wallet_db)
+):
+    """
+    Delete notifications of a wallet in one statement, by ID list and/or age.
+
+    Args:
+        wallet_address: Wallet address
+        ids: Optional notification IDs
+        older_than: Optional cut-off timestamp
+        db: Database session
+
+    Returns:
+        BulkUpdateResponse: Number of notifications deleted
+
+    Raises:
+        HTTPException: If neither ids nor older_than is given
+    """
+    if not ids and older_than is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide ids or older_than"
         )
 
-    db.delete(notification)
+    query = db.query(Notification).filter(Notification.wallet_address == wallet_address)
+    if ids:
+        query = query.filter(Notification.id.in_(ids))
+    if older_than is not None:
+        if older_than.tzinfo is not None:
+            # created_at is stored as naive UTC
+            older_than = older_than.astimezone(timezone.utc).replace(tzinfo=None)
+        query = query.filter(Notification.created_at < older_than)
+
+    affected = query.delete(synchronize_session=False)
     db.commit()
 
-    return {"message": "Notification deleted successfully"}
\ No newline at end of file
+    return BulkUpdateResponse(wallet_address=wallet_address, affected=affected)
\ No newline at end of file
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
-from app.database import get_db
-from app.models import Transaction, Wallet
-import secrets
+from app.config import get_settings
+from app.connections import get_manager
+from app.counterparties import record_transfer
+from app.database import get_db, session_scope, wallet_session
+from app.events import TransactionEvent, get_streams
+from app.models import Transaction, Wallet, generate_transaction_hash
+from app.sharding import ShardRouter, TransferError, get_router, transaction_session, transfer
+from app.singleflight import coalesced_read
+from functools import partial
+from typing import AsyncIterator, Optional
+import asyncio
 
 # Create router instance
 router = APIRouter()
@@ -31,17 +40,96 @@ class TransactionResponse(BaseModel):
 
 # ===== Helper Functions =====
 
-def generate_transaction_hash() -> str:
+def format_sse(event: TransactionEvent) -> str:
     """
-    Generate a mock transaction hash.
-    Format: 0x followed by 64 hexadecimal characters
+    Format a transaction as a Server-Sent Events message.
+    The transaction ID is the event ID, so clients resume with Last-Event-ID.
+    """
+    return f"id: {event.id}\nevent: transaction\ndata: {event.data}\n\n"
+
+
+def to_response(transaction: Transaction) -> TransactionResponse:
+    """Build a transaction response from a ledger row"""
+    return TransactionResponse(
+        id=transaction.id,
+        sender_address=transaction.sender_address,
+        recipient_address=transaction.recipient_address,
+        amount=transaction.amount,
+        status=transaction.status,
+        transaction_hash=transaction.transaction_hash,
+        timestamp=transaction.timestamp.isoformat()
+    )
+
+
+def to_event(response: TransactionResponse) -> TransactionEvent:
+    """Build a stream event from a transaction response"""
+    return TransactionEvent(
+        id=response.id,
+        sender_address=response.sender_address,
+        recipient_address=response.recipient_address,
+        data=response.model_dump_json()
+    )
+
+
+def _load_transactions_after(address: str, after_id: int, limit: int) -> list[TransactionEvent]:
+    """Load up to limit transactions of an address with ID greater than after_id, oldest first"""
+    with wallet_session(address) as db:
+        transactions = db.query(Transaction).filter(
+            (Transaction.sender_address == address) | (Transaction.recipient_address == address),
+            Transaction.id > after_id
+        ).order_by(Transaction.id).limit(limit).all()
+
+        return [to_event(to_response(tx)) for tx in transactions]
+
+
+def _send_sharded(router: ShardRouter, tx_data: TransactionCreate) -> list[Transaction]:
+    """
+    Make a transfer on the shards (SHARD_URLS) with the same checks and errors
+    as the single-database path.
 
     Returns:
-        str: Mock transaction hash
+        list[Transaction]: The sender's ledger row, followed by the recipient's
+        copy if the transfer crossed shards
     """
-    random_bytes = secrets.token_bytes(32)  # 32 bytes = 64 hex characters
-    tx_hash = "0x" + random_bytes.hex()
-    return tx_hash
+    sender, recipient = tx_data.sender_address, tx_data.recipient_address
+    with router.session(sender) as db:
+        sender_balance = db.query(Wallet.balance).filter(Wallet.address == sender).scalar()
+    if sender_balance is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sender wallet not found"
+        )
+
+    with router.session(recipient) as db:
+        recipient_exists = db.query(Wallet.id).filter(Wallet.address == recipient).first() is not None
+    if not recipient_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipient wallet not found"
+        )
+
+    if sender_balance < tx_data.amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Insufficient balance"
+        )
+
+    # The debit re-checks the balance atomically, so a concurrent send can still fail here
+    try:
+        result = transfer(router, sender, recipient, tx_data.amount)
+    except TransferError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+    rows = []
+    for address in (sender, recipient) if result["cross_shard"] else (sender,):
+        with router.session(address) as db:
+            row = db.query(Transaction).filter(Transaction.transaction_hash == result["transaction_hash"]).one()
+            db.expunge(row)
+            rows.append(row)
+    return rows
 
 
 # ===== API Routes =====
@@ -61,6 +149,11 @@ async def send_transaction(tx_data: TransactionCreate, db: Session = Depends(get
     Raises:
         HTTPException: If sender wallet not found or insufficient balance
     """
+    router = get_router()
+    if router is not None:
+        rows = await asyncio.to_thread(_send_sharded, router, tx_data)
+        return await _publish(rows)
+
     # Verify sender wallet exists
     sender = db.query(Wallet).filter(Wallet.address == tx_data.sender_address).first()
     if not sender:
@@ -100,34 +193,44 @@ async def send_transaction(tx_data: TransactionCreate, db: Session = Depends(get
     sender.balance -= tx_data.amount
     recipient.balance += tx_data.amount
 
-    # Save to database
+    # Save to database, updating the counterparty index in the same commit
     db.add(transaction)
+    db.flush()
+    record_transfer(db, transaction)
     db.commit()
     db.refresh(transaction)
 
-    return TransactionResponse(
-        id=transaction.id,
-        sender_address=transaction.sender_address,
-        recipient_address=transaction.recipient_address,
-        amount=transaction.amount,
-        status=transaction.status,
-        transaction_hash=transaction.transaction_hash,
-        timestamp=transaction.timestamp.isoformat()
-    )
+    return await _publish([transaction])
 
 
-@router.get("/history/{address}", response_model=list[TransactionResponse])
-async def get_transaction_history(address: str, db: Session = Depends(get_db)):
+async def _publish(rows: list[Transaction]) -> TransactionResponse:
     """
-    Get transaction history for a wallet address.
+    Push a committed transfer to the live streams and WebSocket connections
+    of both parties, and return the sender's view of it.
 
     Args:
-        address: Wallet address
-        db: Database session
+        rows: The transfer's ledger row, or the sender's row and the
+            recipient's copy for a cross-shard transfer (each with its own ID)
 
     Returns:
-        list[TransactionResponse]: List of transactions
+        TransactionResponse: The sender's ledger row
     """
+    responses = [to_response(row) for row in rows]
+    sender, recipient = responses[0].sender_address, responses[0].recipient_address
+    parties = [{sender, recipient}] if len(responses) == 1 else [{sender}, {recipient}]
+
+    for response, addresses in zip(responses, parties):
+        event = to_event(response)
+        get_streams().publish(event, addresses)
+        message = '{"type":"transaction","data":' + event.data + "}"
+        for address in addresses:
+            await get_manager().send_personal_message(message, address)
+
+    return responses[0]
+
+
+def _load_transaction_history(db: Session, address: str) -> list[TransactionResponse]:
+    """Query transaction history (shared by concurrent identical requests)"""
     # Get transactions where address is sender or recipient
     transactions = db.query(Transaction).filter(
         (Transaction.sender_address == address) | (Transaction.recipient_address == address)
@@ -147,21 +250,8 @@ async def get_transaction_history(address: str, db: Session = Depends(get_db)):
     ]
 
 
-@router.get("/{tx_hash}", response_model=TransactionResponse)
-async def get_transaction(tx_hash: str, db: Session = Depends(get_db)):
-    """
-    Get transaction details by hash.
-
-    Args:
-        tx_hash: Transaction hash
-        db: Database session
-
-    Returns:
-        TransactionResponse: Transaction details
-
-    Raises:
-        HTTPException: If transaction not found
-    """
+def _load_transaction(db: Session, tx_hash: str) -> TransactionResponse:
+    """Query a transaction by hash (shared by concurrent identical requests)"""
     transaction = db.query(Transaction).filter(Transaction.transaction_hash == tx_hash).first()
 
     if not transaction:
@@ -178,4 +268,112 @@ async def get_transaction(tx_hash: str, db: Session = Depends(get_db)):
         status=transaction.status,
         transaction_hash=transaction.transaction_hash,
         timestamp=transaction.timestamp.isoformat()
+    )
+
+
+@router.get("/history/{address}", response_model=list[TransactionResponse])
+async def get_transaction_history(address: str):
+    """
+    Get transaction history for a wallet address.
+    Concurrent requests for the same address share one query.
+
+    Args:
+        address: Wallet address
+
+    Returns:
+        list[TransactionResponse]: List of transactions
+    """
+    return await coalesced_read(
+        ("transactions.history", address), partial(_load_transaction_history, address=address),
+        list[TransactionResponse], session=partial(wallet_session, address)
+    )
+
+
+@router.get("/stream/{address}")
+async def stream_transactions(
+    address: str,
+    last_event_id: Optional[int] = Query(None, description="Resume after this transaction ID"),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Live tail of a wallet's transactions as Server-Sent Events.
+
+    Transactions after the Last-Event-ID header (or last_event_id query
+    parameter, for the first connection) are sent first, then new transfers
+    are pushed as they commit. Comment lines are sent as heartbeats.
+
+    Args:
+        address: Wallet address
+        last_event_id: Optional transaction ID to resume after
+        last_event_id_header: Last-Event-ID header sent by reconnecting clients
+
+    Returns:
+        StreamingResponse: text/event-stream of transactions
+    """
+    settings = get_settings()
+    streams = get_streams()
+    resume_after = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    async def events() -> AsyncIterator[str]:
+        # Subscribe before the catch-up query so nothing committed meanwhile is missed
+        subscription = streams.subscribe(address)
+        try:
+            # Reconnect delay for the client after the stream ends (e.g. on overflow)
+            yield f"retry: {settings.sse_retry_ms}\n\n"
+
+            last_sent = 0
+            if resume_after is not None:
+                last_sent = resume_after
+                while True:
+                    batch = await asyncio.to_thread(
+                        _load_transactions_after, address, last_sent, settings.sse_buffer_size
+                    )
+                    for event in batch:
+                        yield format_sse(event)
+                        last_sent = event.id
+                    if len(batch) < settings.sse_buffer_size:
+                        break
+
+            while True:
+                try:
+                    event = await streams.next_event(subscription, settings.sse_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # Buffer overflowed: end the stream, the client resumes from Last-Event-ID
+                    break
+                if event.id > last_sent:
+                    yield format_sse(event)
+                    last_sent = event.id
+        finally:
+            streams.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{tx_hash}", response_model=TransactionResponse)
+async def get_transaction(tx_hash: str):
+    """
+    Get transaction details by hash.
+    Concurrent requests for the same hash share one query. With sharding the
+    row is read from the sender's shard, which holds the transfer's status.
+
+    Args:
+        tx_hash: Transaction hash
+
+    Returns:
+        TransactionResponse: Transaction details
+
+    Raises:
+        HTTPException: If transaction not found
+    """
+    router = get_router()
+    return await coalesced_read(
+        ("transactions.get", tx_hash), partial(_load_transaction, tx_hash=tx_hash), TransactionResponse,
+        session=session_scope if router is None else partial(transaction_session, router, tx_hash)
     )
\ No newline at end of file
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from app.database import get_db
-from app.models import Wallet
+from functools import partial
+from datetime import datetime, timezone
+from typing import Optional
+from app.database import get_wallet_db, wallet_session
+from app.models import CounterpartyEdge, Wallet
+from app.singleflight import coalesced_read
+from app.snapshots import balance_at
 
 # Create router instance
 router = APIRouter()
@@ -17,15 +22,28 @@ class WalletInfo(BaseModel):
     created_at: str
 
 
+class CounterpartyResponse(BaseModel):
+    """Schema for one counterparty of a wallet"""
+    counterparty: str
+    tx_count: int
+    volume: float
+    last_seen: str
+
+
 # ===== API Routes =====
 
 @router.get("/balance/{address}", response_model=dict)
-async def get_wallet_balance(address: str, db: Session = Depends(get_db)):
+async def get_wallet_balance(
+    address: str,
+    at: Optional[datetime] = Query(None, description="Balance as of this time (UTC) instead of now"),
+    db: Session = Depends(get_wallet_db)
+):
     """
-    Get wallet balance by address.
+    Get wallet balance by address, now or at a point in time.
 
     Args:
         address: Wallet address
+        at: Optional point in time; answered from the nearest earlier balance snapshot
         db: Database session
 
     Returns:
@@ -42,20 +60,55 @@ async def get_wallet_balance(address: str, db: Session = Depends(get_db)):
             detail="Wallet not found"
         )
 
+    if at is None:
+        return {
+            "address": wallet.address,
+            "balance": wallet.balance
+        }
+
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    if wallet.created_at and at < wallet.created_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wallet did not exist at the requested time"
+        )
+
+    balance, snapshot, replayed = balance_at(db, address, at)
     return {
         "address": wallet.address,
-        "balance": wallet.balance
+        "balance": balance,
+        "at": at.isoformat(),
+        "snapshot_at": snapshot.taken_at.isoformat() if snapshot else None,
+        "replayed_transactions": replayed
     }
 
 
+def _load_wallet_info(db: Session, address: str) -> WalletInfo:
+    """Query wallet information (shared by concurrent identical requests)"""
+    wallet = db.query(Wallet).filter(Wallet.address == address).first()
+
+    if not wallet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wallet not found"
+        )
+
+    return WalletInfo(
+        address=wallet.address,
+        balance=wallet.balance,
+        created_at=wallet.created_at.isoformat()
+    )
+
+
 @router.get("/info/{address}", response_model=WalletInfo)
-async def get_wallet_info(address: str, db: Session = Depends(get_db)):
+async def get_wallet_info(address: str):
     """
     Get complete wallet information by address.
+    Concurrent requests for the same address share one query.
 
     Args:
         address: Wallet address
-        db: Database session
 
     Returns:
         WalletInfo: Complete wallet information
@@ -63,16 +116,43 @@ async def get_wallet_info(address: str, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If wallet not found
     """
-    wallet = db.query(Wallet).filter(Wallet.address == address).first()
+    return await coalesced_read(
+        ("wallet.info", address), partial(_load_wallet_info, address=address), WalletInfo,
+        session=partial(wallet_session, address)
+    )
+
+
+@router.get("/counterparties/{address}", response_model=list[CounterpartyResponse])
+async def get_top_counterparties(
+    address: str,
+    limit: int = Query(10, ge=1, le=100, description="Number of counterparties to return"),
+    order_by: str = Query("count", pattern="^(count|volume)$", description="Rank by transfer count or volume"),
+    db: Session = Depends(get_wallet_db)
+):
+    """
+    Get a wallet's top counterparties, ranked by transfer count or volume.
+    Read from the counterparty index rather than the transaction history.
 
-    if not wallet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
+    Args:
+        address: Wallet address
+        limit: Number of counterparties to return
+        order_by: "count" or "volume"
+        db: Database session
 
-    return WalletInfo(
-        address=wallet.address,
-        balance=wallet.balance,
-        created_at=wallet.created_at.isoformat()
-    )
\ No newline at end of file
+    Returns:
+        list[CounterpartyResponse]: Counterparties, highest ranked first
+    """
+    rank = CounterpartyEdge.tx_count if order_by == "count" else CounterpartyEdge.volume
+    edges = db.query(CounterpartyEdge).filter(
+        CounterpartyEdge.address == address
+    ).order_by(rank.desc()).limit(limit).all()
+
+    return [
+        CounterpartyResponse(
+            counterparty=edge.counterparty,
+            tx_count=edge.tx_count,
+            volume=edge.volume,
+            last_seen=edge.last_seen.isoformat()
+        )
+        for edge in edges
+    ]
\ No newline at end of file
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.counterparties import backfill_statement
+from app.database import Base
+from app.models import BalanceSnapshot, Notification, SchemaVersion, Transaction
+
+# Bump this whenever a model or index changes, and register a migration below
+# if existing databases need more than the new tables create_all() would add.
+SCHEMA_VERSION = 8
+
+# Key of the PostgreSQL advisory lock held while upgrading the schema
+UPGRADE_LOCK_KEY = 0x77616C6C6574  # "wallet"
+
+
+def _create_indexes(*tables):
+    """Build a migration step that adds any missing indexes of existing tables"""
+    def migrate(conn: Connection):
+        for table in tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+    return migrate
+
+
+def _backfill_counterparties(conn: Connection):
+    conn.execute(backfill_statement())
+
+
+# Migration steps keyed by the version they upgrade *to*.
+# Each step receives a connection inside the upgrade transaction.
+MIGRATIONS: dict[int, Callable[[Connection], None]] = {
+    2: _create_indexes(Notification.__table__),
+    3: _backfill_counterparties,
+    6: _create_indexes(Transaction.__table__),
+    8: _create_indexes(BalanceSnapshot.__table__),
+}
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database was created by a newer version of the app"""
+
+
+def get_schema_version(conn: Connection) -> Optional[int]:
+    """
+    Read the schema version stamped in the database.
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        Optional[int]: Stamped version, 0 for a pre-versioning database,
+        or None for an empty database
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table(SchemaVersion.__tablename__):
+        return 0 if inspector.has_table("wallets") else None
+    return conn.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar() or 0
+
+
+def _lock_for_upgrade(conn: Connection):
+    """
+    Take the database-wide write lock for the rest of the transaction, so
+    concurrent workers upgrade one at a time.
+
+    pysqlite only opens a transaction before DML and runs DDL in autocommit
+    mode, so on SQLite the transaction is started explicitly with BEGIN
+    IMMEDIATE. PostgreSQL DDL is transactional; an advisory lock serializes it.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif dialect == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": UPGRADE_LOCK_KEY})
+
+
+def ensure_schema(engine: Engine) -> int:
+    """
+    Make sure the database schema matches SCHEMA_VERSION.
+
+    A database that is already current costs a single version lookup; DDL only
+    runs for empty databases and for databases stamped with an older version.
+    Upgrades hold the database write lock and re-read the version first, so
+    when several workers start at once only the first one migrates.
+
+    Args:
+        engine: Database engine
+
+    Returns:
+        int: Schema version the database was at before this call (0 if new)
+
+    Raises:
+        SchemaVersionError: If the database is newer than this code
+    """
+    with engine.connect() as conn:
+        version = get_schema_version(conn)
+        conn.rollback()
+        if version == SCHEMA_VERSION:
+            return version
+
+    with engine.connect() as conn:
+        _lock_for_upgrade(conn)
+        version = get_schema_version(conn)
+        if version == SCHEMA_VERSION:
+            conn.rollback()
+            return version
+
+        if version is not None and version > SCHEMA_VERSION:
+            raise SchemaVersionError(
+                f"Database schema version {version} is newer than supported version {SCHEMA_VERSION}"
+            )
+
+        # Creates any missing tables (all of them for an empty database)
+        Base.metadata.create_all(bind=conn)
+
+        if version is not None:
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                migration = MIGRATIONS.get(target)
+                if migration is not None:
+                    migration(conn)
+
+        stamp = SchemaVersion.__table__
+        conn.execute(stamp.delete())
+        conn.execute(stamp.insert().values(id=1, version=SCHEMA_VERSION, applied_at=datetime.utcnow()))
+        conn.commit()
+
+        return version or 0
@@ -0,0 +1,282 @@
+"""
+Synthetic dataset generator for scale testing.
+
+Bulk-generates wallets, transactions and notifications shaped like
+app/models.py, using batched Core inserts with one transaction per chunk.
+Wallet activity follows a power law, so a few wallets account for most
+transfers. The same --seed and --end always produce the same data.
+
+Transfers are applied in order against running balances. A transfer the
+sender cannot cover is written as "failed" and moves no funds, as the API
+would refuse it, so no balance goes below zero and the final balances
+reconcile against the ledger.
+
+The target database must not already hold wallets or transactions.
+
+Examples (from the backend directory):
+    python -m app.seed --sqlite-file scale.db --wallets 1000000 --transactions 10000000
+    python -m app.seed --database-url postgresql://... --wallets 10000 --seed 7
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
+from sqlalchemy import bindparam, create_engine, event, exists, select
+from sqlalchemy.engine import Engine
+from app.config import get_settings
+from app.counterparties import backfill_statement
+from app.models import INITIAL_BALANCE, Notification, Transaction, Wallet
+from app.schema import ensure_schema
+
+NOTIFICATION_TYPES = np.array(["success", "info", "warning", "error"])
+NOTIFICATION_TYPE_WEIGHTS = [0.6, 0.25, 0.1, 0.05]
+
+
+class _Throughput:
+    """Collects rows written and elapsed time per phase"""
+
+    def __init__(self):
+        self.phases: list[tuple[str, int, float]] = []
+
+    def record(self, name: str, rows: int, started: float):
+        elapsed = time.perf_counter() - started
+        self.phases.append((name, rows, elapsed))
+        rate = rows / elapsed if elapsed else float("inf")
+        print(f"{name:<16} {rows:>12,} rows {elapsed:>9.2f}s {rate:>12,.0f} rows/s")
+
+
+def _hex_strings(rng: np.random.Generator, count: int, nbytes: int, prefix: str = "") -> list[str]:
+    raw = rng.bytes(count * nbytes)
+    return [prefix + raw[i:i + nbytes].hex() for i in range(0, count * nbytes, nbytes)]
+
+
+def _timestamps(rng: np.random.Generator, count: int, start: datetime, end: datetime) -> list[datetime]:
+    """Sorted random timestamps in [start, end)"""
+    offsets = np.sort(rng.uniform(0, (end - start).total_seconds(), size=count))
+    return [start + timedelta(seconds=offset) for offset in offsets.tolist()]
+
+
+def _chunks(total: int, chunk_size: int):
+    for start in range(0, total, chunk_size):
+        yield start, min(chunk_size, total - start)
+
+
+def activity_weights(rng: np.random.Generator, wallets: int, alpha: float) -> np.ndarray:
+    """
+    Power-law activity distribution over wallets: the k-th most active wallet
+    is picked with probability proportional to 1 / k**alpha. Ranks are
+    shuffled so activity is not correlated with creation order.
+    """
+    weights = 1.0 / np.arange(1, wallets + 1, dtype=np.float64) ** alpha
+    weights = weights[rng.permutation(wallets)]
+    return weights / weights.sum()
+
+
+def make_engine(database_url: str) -> Engine:
+    """Engine tuned for bulk loading (SQLite: WAL journal, no fsync per commit)"""
+    if "sqlite" not in database_url:
+        return create_engine(database_url)
+
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _bulk_load_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    return engine
+
+
+def seed(engine: Engine, wallets: int, transactions: int, notifications: int, seed: int = 0,
+         alpha: float = 1.1, chunk_size: int = 50000, days: int = 365, end: Optional[datetime] = None,
+         counterparties: bool = True) -> list[tuple[str, int, float]]:
+    """
+    Generate a synthetic dataset.
+
+    Args:
+        engine: Target database engine (the schema is created if needed)
+        wallets: Number of wallets
+        transactions: Number of transactions
+        notifications: Number of notifications
+        seed: Random seed
+        alpha: Power-law exponent of wallet activity
+        chunk_size: Rows per insert transaction
+        days: Time span covered by the data
+        end: End of the time span (defaults to today, midnight UTC)
+        counterparties: Also build the counterparty index
+
+    Returns:
+        list: (phase, rows, seconds) per generation phase
+
+    Raises:
+        ValueError: If fewer than two wallets are requested or the target
+        already holds wallets or transactions
+    """
+    if wallets < 2:
+        raise ValueError("At least two wallets are needed to generate transfers")
+
+    ensure_schema(engine)
+    # Balances and the counterparty index are derived from the generated rows
+    # alone, so refuse to mix them with existing data before writing anything
+    with engine.connect() as conn:
+        populated = conn.execute(select(exists(select(Wallet.address)) | exists(select(Transaction.id)))).scalar()
+    if populated:
+        raise ValueError("Target database already has wallets or transactions; seed an empty database")
+
+    rng = np.random.default_rng(seed)
+    end = end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    throughput = _Throughput()
+
+    # Wallets are created during the first tenth of the time span
+    started = time.perf_counter()
+    addresses = []
+    created = _timestamps(rng, wallets, start, start + (end - start) / 10)
+    for offset, count in _chunks(wallets, chunk_size):
+        chunk_addresses = _hex_strings(rng, count, 20, "0x")
+        private_keys = _hex_strings(rng, count, 32)
+        with engine.begin() as conn:
+            conn.execute(Wallet.__table__.insert(), [
+                {"address": address, "private_key": key, "balance": INITIAL_BALANCE, "created_at": at}
+                for address, key, at in zip(chunk_addresses, private_keys, created[offset:offset + count])
+            ])
+        addresses.extend(chunk_addresses)
+    throughput.record("wallets", wallets, started)
+
+    weights = activity_weights(rng, wallets, alpha)
+    balances = [INITIAL_BALANCE] * wallets
+    changed = set()
+    ledger_start = start + (end - start) / 10
+    slice_length = (end - ledger_start) / max(1, -(-transactions // chunk_size))
+
+    # Transactions: chunk k covers the k-th time slice, so IDs follow timestamps
+    started = time.perf_counter()
+    for index, (offset, count) in enumerate(_chunks(transactions, chunk_size)):
+        senders = rng.choice(wallets, size=count, p=weights)
+        recipients = rng.choice(wallets, size=count, p=weights)
+        same = senders == recipients
+        recipients[same] = (recipients[same] + rng.integers(1, wallets, size=int(same.sum()))) % wallets
+        amounts = np.round(rng.uniform(0.01, 0.05, size=count), 4)
+        hashes = _hex_strings(rng, count, 32, "0x")
+        slice_start = ledger_start + slice_length * index
+        stamps = _timestamps(rng, count, slice_start, slice_start + slice_length)
+
+        rows = []
+        for sender, recipient, amount, tx_hash, at in zip(
+            senders.tolist(), recipients.tolist(), amounts.tolist(), hashes, stamps
+        ):
+            # Overdrawing transfers are recorded as failed and move no funds
+            status = "failed"
+            if balances[sender] >= amount:
+                balances[sender] -= amount
+                balances[recipient] += amount
+                changed.update((sender, recipient))
+                status = "completed"
+            rows.append({
+                "sender_address": addresses[sender],
+                "recipient_address": addresses[recipient],
+                "amount": amount,
+                "status": status,
+                "transaction_hash": tx_hash,
+                "timestamp": at,
+            })
+
+        with engine.begin() as conn:
+            conn.execute(Transaction.__table__.insert(), rows)
+    throughput.record("transactions", transactions, started)
+
+    started = time.perf_counter()
+    wallet_table = Wallet.__table__
+    update_balance = wallet_table.update().where(
+        wallet_table.c.address == bindparam("wallet_address")
+    ).values(balance=bindparam("new_balance"))
+    changed = sorted(changed)
+    for offset, count in _chunks(len(changed), chunk_size):
+        with engine.begin() as conn:
+            conn.execute(update_balance, [
+                {"wallet_address": addresses[i], "new_balance": balances[i]}
+                for i in changed[offset:offset + count]
+            ])
+    throughput.record("balances", len(changed), started)
+
+    started = time.perf_counter()
+    for offset, count in _chunks(notifications, chunk_size):
+        owners = rng.choice(wallets, size=count, p=weights)
+        types = rng.choice(NOTIFICATION_TYPES, size=count, p=NOTIFICATION_TYPE_WEIGHTS)
+        amounts = np.round(rng.uniform(0.01, 0.05, size=count), 4)
+        read = rng.random(size=count) < 0.7
+        stamps = _timestamps(rng, count, ledger_start, end)
+        with engine.begin() as conn:
+            conn.execute(Notification.__table__.insert(), [
+                {
+                    "wallet_address": addresses[owner],
+                    "message": f"Transaction of {amount} ETH: {kind}",
+                    "type": kind,
+                    "read": is_read,
+                    "created_at": at,
+                }
+                for owner, kind, amount, is_read, at in zip(
+                    owners.tolist(), types.tolist(), amounts.tolist(), read.tolist(), stamps
+                )
+            ])
+    throughput.record("notifications", notifications, started)
+
+    if counterparties:
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            edges = conn.execute(backfill_statement()).rowcount
+        throughput.record("counterparties", edges, started)
+
+    return throughput.phases
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic wallet dataset for scale testing"
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--database-url", help="Target database (defaults to DATABASE_URL)")
+    target.add_argument("--sqlite-file", help="Write straight to this SQLite file")
+    parser.add_argument("--wallets", type=int, default=10000)
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--notifications", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--alpha", type=float, default=1.1, help="Power-law exponent of wallet activity")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per insert transaction")
+    parser.add_argument("--days", type=int, default=365, help="Time span covered by the data")
+    parser.add_argument("--end", type=datetime.fromisoformat,
+                        help="End of the time span, ISO format (defaults to today, midnight UTC)")
+    parser.add_argument("--skip-counterparties", action="store_true", help="Do not build the counterparty index")
+    args = parser.parse_args()
+
+    if args.sqlite_file:
+        database_url = f"sqlite:///{args.sqlite_file}"
+    else:
+        database_url = args.database_url or get_settings().database_url
+
+    started = time.perf_counter()
+    try:
+        phases = seed(
+            make_engine(database_url),
+            wallets=args.wallets,
+            transactions=args.transactions,
+            notifications=args.notifications,
+            seed=args.seed,
+            alpha=args.alpha,
+            chunk_size=args.chunk_size,
+            days=args.days,
+            end=args.end,
+            counterparties=not args.skip_counterparties,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    elapsed = time.perf_counter() - started
+    rows = sum(count for _, count, _ in phases)
+    print(f"{'total':<16} {rows:>12,} rows {elapsed:>9.2f}s {rows / elapsed:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Address-sharded storage.
+
+Wallets are spread over N databases (SHARD_URLS) by the leading hex digits of
+their address, so writes for different wallets go to different SQLite files
+and no longer queue on one writer lock. Every shard has the full schema.
+
+A transfer's ledger row lives on the sender's shard. Transfers between two
+wallets on one shard commit in one local transaction. Cross-shard transfers
+use a two-phase debit/credit protocol:
+
+1. Debit: on the sender's shard, debit the sender and insert the ledger row
+   with status "pending" in one transaction.
+2. Credit: on the recipient's shard, credit the recipient and insert a
+   "completed" copy of the ledger row plus a TransferCredit marker keyed by
+   the transaction hash, in one transaction. The marker makes the credit
+   idempotent.
+3. Complete: mark the sender's ledger row "completed".
+
+recover_pending() rolls interrupted transfers forward after a crash.
+
+Each shard's ledger explains the balances of its own wallets: the sender's
+row debits while pending or completed and the recipient's copy credits (see
+DEBITED_STATUSES). So reconciliation, balance snapshots and point-in-time
+balances work per shard, history() reads one shard, and each side's
+counterparty edge is indexed on the shard that owns it. Transaction IDs are
+per shard, so a cross-shard transfer has one ID on each side.
+
+When SHARD_URLS is set, the HTTP routes keep every wallet's data (wallet,
+ledger, counterparties, notifications, snapshots) on its shard through
+get_router(), and the DATABASE_URL database only holds the background job
+leases.
+
+The recipient is checked before the debit and wallets are never deleted, so
+a credit is not rejected in practice. If it were, step 3 refunds the sender
+and marks the row "failed" instead; a refund after a reconciliation
+checkpoint or balance snapshot would then show up as drift.
+
+Shards must be SQLite databases. A ledger row references wallets on other
+shards, so the wallet foreign keys of the shared schema cannot hold; SQLite
+is the one backend where they can be switched off per connection, and every
+shard connection does so.
+"""
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from typing import Callable, Iterator, Optional, TypeVar
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from app.config import get_settings
+from app.counterparties import record_transfer
+from app.models import INITIAL_BALANCE, Transaction, TransferCredit, Wallet, generate_transaction_hash
+from app.schema import ensure_schema
+
+# Leading hex digits of an address used to pick its shard
+PREFIX_DIGITS = 4
+
+T = TypeVar("T")
+
+
+class TransferError(Exception):
+    """Raised when a transfer cannot be made"""
+
+
+def _shard_engine(url: str) -> Engine:
+    """SQLite engine with foreign key enforcement off (see the module docstring)"""
+    engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _no_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=OFF")
+        cursor.close()
+
+    return engine
+
+
+class ShardRouter:
+    """Maps wallet addresses to shard databases and hands out sessions"""
+
+    def __init__(self, urls: list[str]):
+        if not urls:
+            raise ValueError("At least one shard URL is required")
+        for url in urls:
+            if make_url(url).get_backend_name() != "sqlite":
+                raise ValueError(f"Shards must be SQLite databases, got {make_url(url).render_as_string()}")
+        self.urls = list(urls)
+        self.engines: list[Engine] = [_shard_engine(url) for url in self.urls]
+        self._sessions = [sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in self.engines]
+
+    def ensure_schemas(self):
+        for engine in self.engines:
+            ensure_schema(engine)
+
+    def shard_for(self, address: str) -> int:
+        """
+        Shard index of an address: its leading hex digits modulo the shard count.
+        Addresses that are not 0x-hex fall back to a CRC32 of the whole address.
+        """
+        try:
+            key = int(address[2:2 + PREFIX_DIGITS], 16)
+        except ValueError:
+            key = zlib.crc32(address.encode())
+        return key % len(self.engines)
+
+    @contextmanager
+    def session(self, address: Optional[str] = None, shard: Optional[int] = None) -> Iterator[Session]:
+        """Session on the shard owning address (or on an explicit shard index)"""
+        db = self._sessions[self.shard_for(address) if shard is None else shard]()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
+
+
+@lru_cache(maxsize=1)
+def get_router() -> Optional[ShardRouter]:
+    """Return the process-wide shard router, or None unless SHARD_URLS is set"""
+    urls = get_settings().shard_urls
+    return ShardRouter(list(urls)) if urls else None
+
+
+def create_wallet(router: ShardRouter, address: str, private_key: str,
+                  balance: float = INITIAL_BALANCE) -> Wallet:
+    """Insert a wallet on its shard"""
+    with router.session(address) as db:
+        wallet = Wallet(address=address, private_key=private_key, balance=balance)
+        db.add(wallet)
+        db.commit()
+        db.refresh(wallet)
+        db.expunge(wallet)
+        return wallet
+
+
+def _debit(db: Session, address: str, amount: float) -> bool:
+    """Atomically debit a wallet if it holds enough funds"""
+    result = db.execute(
+        update(Wallet).where(Wallet.address == address, Wallet.balance >= amount).values(
+            balance=Wallet.balance - amount
+        )
+    )
+    return result.rowcount == 1
+
+
+def _credit(db: Session, address: str, amount: float) -> bool:
+    result = db.execute(
+        update(Wallet).where(Wallet.address == address).values(balance=Wallet.balance + amount)
+    )
+    return result.rowcount == 1
+
+
+def _apply_credit(router: ShardRouter, tx_hash: str, sender: str, recipient: str, amount: float) -> bool:
+    """
+    Phase 2: credit the recipient on its shard, at most once per transaction hash,
+    together with the recipient's copy of the ledger row and counterparty edge.
+
+    Returns:
+        bool: True if credited (now or earlier), False if the recipient does not exist
+    """
+    with router.session(recipient) as db:
+        if db.get(TransferCredit, tx_hash) is not None:
+            return True
+        if not _credit(db, recipient, amount):
+            db.rollback()
+            return False
+        credit = Transaction(
+            sender_address=sender,
+            recipient_address=recipient,
+            amount=amount,
+            transaction_hash=tx_hash,
+            status="completed"
+        )
+        db.add(credit)
+        record_transfer(db, credit, only=recipient)
+        db.add(TransferCredit(transaction_hash=tx_hash, recipient_address=recipient, amount=amount))
+        db.commit()
+        return True
+
+
+def _finish(router: ShardRouter, tx_hash: str, sender: str, amount: float, credited: bool) -> str:
+    """Phase 3: complete the ledger row, or refund the sender and fail it"""
+    with router.session(sender) as db:
+        transaction = db.query(Transaction).filter(Transaction.transaction_hash == tx_hash).one()
+        if transaction.status != "pending":
+            return transaction.status
+        if credited:
+            transaction.status = "completed"
+        else:
+            _credit(db, sender, amount)
+            transaction.status = "failed"
+        db.commit()
+        return transaction.status
+
+
+def transfer(router: ShardRouter, sender: str, recipient: str, amount: float) -> dict:
+    """
+    Move funds between two wallets, on the same shard or across shards.
+
+    Args:
+        router: Shard router
+        sender: Sender wallet address
+        recipient: Recipient wallet address
+        amount: Amount to transfer (must be positive)
+
+    Returns:
+        dict: transaction_hash, status and whether the transfer crossed shards
+
+    Raises:
+        TransferError: If the sender is unknown or has insufficient balance,
+        or the recipient is unknown
+    """
+    if amount <= 0:
+        raise TransferError("Amount must be positive")
+
+    tx_hash = generate_transaction_hash()
+    same_shard = router.shard_for(sender) == router.shard_for(recipient)
+
+    if not same_shard:
+        with router.session(recipient) as db:
+            if db.query(Wallet.id).filter(Wallet.address == recipient).first() is None:
+                raise TransferError("Recipient wallet not found")
+
+    with router.session(sender) as db:
+        if not _debit(db, sender, amount):
+            db.rollback()
+            raise TransferError("Sender wallet not found or insufficient balance")
+
+        if same_shard:
+            if not _credit(db, recipient, amount):
+                db.rollback()
+                raise TransferError("Recipient wallet not found")
+
+        # Phase 1 (cross-shard): the debit, the pending ledger row and the
+        # sender's counterparty edge commit together
+        transaction = Transaction(
+            sender_address=sender,
+            recipient_address=recipient,
+            amount=amount,
+            transaction_hash=tx_hash,
+            status="completed" if same_shard else "pending"
+        )
+        db.add(transaction)
+        record_transfer(db, transaction, only=None if same_shard else sender)
+        db.commit()
+
+    if same_shard:
+        return {"transaction_hash": tx_hash, "status": "completed", "cross_shard": False}
+
+    credited = _apply_credit(router, tx_hash, sender, recipient, amount)
+    status = _finish(router, tx_hash, sender, amount, credited)
+    if status == "failed":
+        raise TransferError("Recipient wallet not found")
+    return {"transaction_hash": tx_hash, "status": status, "cross_shard": True}
+
+
+def recover_pending(router: ShardRouter, older_than: timedelta = timedelta(minutes=1)) -> int:
+    """
+    Finish cross-shard transfers interrupted between phases.
+    Pending transfers are rolled forward: credited if not yet credited, then completed.
+
+    Args:
+        router: Shard router
+        older_than: Only touch transfers pending for at least this long
+
+    Returns:
+        int: Number of transfers resolved
+    """
+    cutoff = datetime.utcnow() - older_than
+    resolved = 0
+    for shard in range(len(router.engines)):
+        with router.session(shard=shard) as db:
+            pending = db.query(
+                Transaction.transaction_hash,
+                Transaction.sender_address,
+                Transaction.recipient_address,
+                Transaction.amount,
+            ).filter(Transaction.status == "pending", Transaction.timestamp < cutoff).all()
+
+        for row in pending:
+            credited = _apply_credit(
+                router, row.transaction_hash, row.sender_address, row.recipient_address, row.amount
+            )
+            _finish(router, row.transaction_hash, row.sender_address, row.amount, credited)
+            resolved += 1
+    return resolved
+
+
+def recover_all(older_than: timedelta = timedelta(minutes=1)) -> int:
+    """recover_pending() on the configured shards, as a periodic job"""
+    return recover_pending(get_router(), older_than)
+
+
+def on_each_shard(job: Callable[..., T]) -> list[T]:
+    """
+    Run a maintenance job that takes a session factory (e.g. take_snapshots,
+    compact_notifications) once on every configured shard.
+    """
+    router = get_router()
+    return [job(session=partial(router.session, shard=shard)) for shard in range(len(router.engines))]
+
+
+@contextmanager
+def transaction_session(router: ShardRouter, tx_hash: str) -> Iterator[Session]:
+    """
+    Session on the shard holding the sender's ledger row of a transaction,
+    which carries its authoritative status (the recipient's copy of a
+    cross-shard transfer is always "completed"). Falls back to the first
+    shard when no shard has the hash.
+    """
+    shard = 0
+    for index in range(len(router.engines)):
+        with router.session(shard=index) as db:
+            sender = db.query(Transaction.sender_address).filter(
+                Transaction.transaction_hash == tx_hash
+            ).scalar()
+        if sender is not None:
+            shard = router.shard_for(sender)
+            break
+    with router.session(shard=shard) as db:
+        yield db
+
+
+def history(router: ShardRouter, address: str, limit: Optional[int] = None) -> list[Transaction]:
+    """
+    Transaction history of an address, newest first.
+
+    Outgoing transfers and the recipient's copies of incoming cross-shard
+    transfers both live on the address's own shard, so one shard answers.
+
+    Args:
+        router: Shard router
+        address: Wallet address
+        limit: Optional maximum number of transactions
+
+    Returns:
+        list[Transaction]: Detached transactions ordered by timestamp, newest first
+    """
+    with router.session(address) as db:
+        query = db.query(Transaction).filter(
+            (Transaction.sender_address == address) | (Transaction.recipient_address == address)
+        ).order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        rows = query.all()
+        db.expunge_all()
+        return rows
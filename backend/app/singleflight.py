@@ -0,0 +1,131 @@
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, ContextManager, Hashable, TypeVar
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.database import session_scope
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight:
+    """A database read in progress and how many requests are waiting on it"""
+    task: asyncio.Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads into one execution.
+
+    While a read for a key is in flight, further requests for the same key
+    await its result instead of running their own query. Once it completes
+    the key is forgotten, so a result is never served to a request that
+    arrived after it was computed.
+    """
+
+    def __init__(self, max_waiters: int = 1000):
+        self.max_waiters = max_waiters
+        self._flights: dict[Hashable, _Flight] = {}
+        self.requests = 0
+        self.executions = 0
+        self.overflows = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run a blocking function in a worker thread, sharing the call with
+        concurrent callers that use the same key.
+
+        Args:
+            key: Identifies identical reads (route and parameters)
+            fn: Blocking function producing the result
+
+        Returns:
+            The function's result (exceptions are raised to every waiter)
+        """
+        self.requests += 1
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            if flight.waiters < self.max_waiters:
+                flight.waiters += 1
+                return await asyncio.shield(flight.task)
+            # Too many waiters on this key: run independently
+            self.overflows += 1
+            self.executions += 1
+            return await asyncio.to_thread(fn)
+
+        self.executions += 1
+        task = asyncio.ensure_future(asyncio.to_thread(fn))
+        flight = _Flight(task)
+        self._flights[key] = flight
+        task.add_done_callback(lambda done: self._land(key, flight))
+
+        # Shielded so a disconnecting leader does not cancel the read for its waiters
+        return await asyncio.shield(task)
+
+    def _land(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            flight.task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Coalescing counters since startup.
+
+        Returns:
+            dict: requests, executions, overflows, in_flight and coalescing_ratio
+            (share of requests answered by another request's query)
+        """
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "overflows": self.overflows,
+            "in_flight": len(self._flights),
+            "coalescing_ratio": 1 - self.executions / self.requests if self.requests else 0.0,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_flight() -> SingleFlight:
+    """Return the process-wide single-flight group"""
+    return SingleFlight(max_waiters=get_settings().singleflight_max_waiters)
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+async def coalesced_read(key: Hashable, load: Callable[[Session], Any], response_model: Any,
+                         session: Callable[[], ContextManager[Session]] = session_scope) -> Response:
+    """
+    Run a read-only query once for all concurrent requests with the same key.
+    The query gets its own session, independent of any single request, and
+    the result is serialized to JSON once inside the flight, so waiters only
+    share bytes and FastAPI does not re-validate the model per request.
+
+    Args:
+        key: Route name and parameters, e.g. ("wallet.info", address)
+        load: Function that queries the database and returns a response model
+        response_model: Type of the loaded value, e.g. list[TransactionResponse]
+        session: Opens the query's session, e.g. partial(wallet_session, address)
+            for a wallet's shard (defaults to the DATABASE_URL database)
+
+    Returns:
+        Response: JSON response wrapping the shared body
+    """
+    adapter = _adapter(response_model)
+
+    def run() -> bytes:
+        with session() as db:
+            return adapter.dump_json(load(db))
+
+    # Each request gets its own Response: middleware (e.g. CORS) edits headers in place
+    return Response(content=await get_flight().do(key, run), media_type="application/json")
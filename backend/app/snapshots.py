@@ -0,0 +1,185 @@
+"""
+Periodic per-wallet balance snapshots.
+
+Each run snapshots the balance of every wallet that had transfers since the
+previous run (or has never been snapshotted), together with the ID and time
+of the last transaction the balance includes. Point-in-time balance queries
+start from the nearest earlier snapshot and only replay transactions after it.
+
+Run once from the backend directory:
+    python -m app.snapshots
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, Optional
+from sqlalchemy import exists, func, insert, literal, or_, select, text, union
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.database import session_scope
+from app.models import DEBITED_STATUSES, INITIAL_BALANCE, BalanceSnapshot, Transaction, Wallet
+
+logger = logging.getLogger(__name__)
+
+# Rough on-disk size of one snapshot row plus its index entry, for databases
+# that cannot report table sizes
+ESTIMATED_ROW_BYTES = 160
+
+
+@dataclass
+class SnapshotReport:
+    """Outcome of one snapshot run and the resulting storage overhead"""
+    written: int = 0
+    pruned: int = 0
+    total_rows: int = 0
+    wallets_covered: int = 0
+    storage_bytes: int = 0
+    storage_estimated: bool = False
+    duration_seconds: float = 0.0
+
+
+def _storage_bytes(db: Session, total_rows: int) -> tuple[int, bool]:
+    """Bytes used by the snapshot table and its indexes (estimated if the database can't tell)"""
+    if db.get_bind().dialect.name == "sqlite":
+        try:
+            size = db.execute(text(
+                "SELECT sum(pgsize) FROM dbstat "
+                "WHERE name = 'balance_snapshots' OR tbl_name = 'balance_snapshots'"
+            )).scalar()
+            return int(size or 0), False
+        except DBAPIError:
+            db.rollback()
+    return total_rows * ESTIMATED_ROW_BYTES, True
+
+
+def take_snapshots(retention_days: Optional[int] = None,
+                   session: Callable[[], ContextManager[Session]] = session_scope) -> SnapshotReport:
+    """
+    Snapshot the balances of wallets that changed since the previous run,
+    then prune snapshots older than the retention period.
+
+    Args:
+        retention_days: Days to keep snapshots (defaults to SNAPSHOT_RETENTION_DAYS, 0 disables pruning)
+        session: Opens the session of the database to snapshot (defaults to DATABASE_URL)
+
+    Returns:
+        SnapshotReport: Rows written and pruned, and storage overhead
+    """
+    if retention_days is None:
+        retention_days = get_settings().snapshot_retention_days
+
+    started = time.perf_counter()
+    report = SnapshotReport()
+    now = datetime.utcnow()
+
+    with session() as db:
+        # Everything is read inside one INSERT ... SELECT, so each balance and
+        # the ledger position recorded with it come from the same database
+        # state, and a concurrent run (e.g. the CLI) sees this run's rows
+        previous = select(
+            func.coalesce(func.max(BalanceSnapshot.last_transaction_id), 0)
+        ).scalar_subquery()
+        last_id = select(func.max(Transaction.id)).scalar_subquery()
+        last_at = select(Transaction.timestamp).where(Transaction.id == last_id).scalar_subquery()
+        changed = union(
+            select(Transaction.sender_address).where(Transaction.id > previous),
+            select(Transaction.recipient_address).where(Transaction.id > previous),
+        ).subquery()
+        never = ~exists().where(BalanceSnapshot.address == Wallet.address)
+
+        rows = select(
+            Wallet.address,
+            Wallet.balance,
+            func.coalesce(last_id, 0),
+            last_at,
+            literal(now),
+        ).where(or_(Wallet.address.in_(select(changed.c[0])), never))
+
+        report.written = db.execute(insert(BalanceSnapshot).from_select(
+            ["address", "balance", "last_transaction_id", "last_transaction_at", "taken_at"], rows
+        )).rowcount
+        db.commit()
+
+        if retention_days:
+            cutoff = now - timedelta(days=retention_days)
+            # Keep each wallet's newest snapshot before the cutoff, so queries
+            # inside the retention window still start from a nearby snapshot
+            keep = select(func.max(BalanceSnapshot.id)).where(
+                BalanceSnapshot.taken_at < cutoff
+            ).group_by(BalanceSnapshot.address)
+            report.pruned = db.query(BalanceSnapshot).filter(
+                BalanceSnapshot.taken_at < cutoff,
+                BalanceSnapshot.id.notin_(keep)
+            ).delete(synchronize_session=False)
+            db.commit()
+
+        report.total_rows = db.query(func.count(BalanceSnapshot.id)).scalar()
+        report.wallets_covered = db.query(func.count(func.distinct(BalanceSnapshot.address))).scalar()
+        report.storage_bytes, report.storage_estimated = _storage_bytes(db, report.total_rows)
+
+    report.duration_seconds = time.perf_counter() - started
+    logger.info(
+        "Balance snapshots: wrote %d, pruned %d, %d rows for %d wallets (%s%d bytes) in %.2fs",
+        report.written, report.pruned, report.total_rows, report.wallets_covered,
+        "~" if report.storage_estimated else "", report.storage_bytes, report.duration_seconds,
+    )
+    return report
+
+
+def balance_at(db: Session, address: str, at: datetime) -> tuple[float, Optional[BalanceSnapshot], int]:
+    """
+    Balance of a wallet at a point in time.
+
+    Starts from the newest snapshot whose last included transaction is at
+    or before `at`, and replays the transactions after that ledger position
+    up to `at`. The snapshot is chosen by ledger position rather than by
+    taken_at, because taken_at is stamped when the run starts and a snapshot
+    can include transactions committed after it. Without a snapshot the
+    whole history is replayed from the opening balance.
+
+    Args:
+        db: Database session
+        address: Wallet address
+        at: Point in time (UTC)
+
+    Returns:
+        tuple: (balance, snapshot used or None, transactions replayed)
+    """
+    # A snapshot of an empty ledger (no last transaction) holds the opening balance
+    snapshot = db.query(BalanceSnapshot).filter(
+        BalanceSnapshot.address == address,
+        or_(BalanceSnapshot.last_transaction_at <= at, BalanceSnapshot.last_transaction_at.is_(None))
+    ).order_by(BalanceSnapshot.last_transaction_id.desc(), BalanceSnapshot.id.desc()).first()
+
+    balance = snapshot.balance if snapshot else INITIAL_BALANCE
+    criteria = [Transaction.timestamp <= at]
+    if snapshot is not None:
+        criteria.append(Transaction.id > snapshot.last_transaction_id)
+
+    received, received_count = db.query(
+        func.coalesce(func.sum(Transaction.amount), 0.0), func.count(Transaction.id)
+    ).filter(Transaction.recipient_address == address, Transaction.status == "completed", *criteria).one()
+    sent, sent_count = db.query(
+        func.coalesce(func.sum(Transaction.amount), 0.0), func.count(Transaction.id)
+    ).filter(Transaction.sender_address == address, Transaction.status.in_(DEBITED_STATUSES), *criteria).one()
+
+    return balance + received - sent, snapshot, received_count + sent_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Take balance snapshots once and report storage overhead")
+    parser.add_argument("--retention-days", type=int, help="Override SNAPSHOT_RETENTION_DAYS (0 disables pruning)")
+    args = parser.parse_args()
+
+    report = take_snapshots(args.retention_days)
+
+    print(f"Wrote {report.written} snapshots, pruned {report.pruned} in {report.duration_seconds:.2f}s")
+    print(f"Snapshot table: {report.total_rows} rows for {report.wallets_covered} wallets, "
+          f"{'~' if report.storage_estimated else ''}{report.storage_bytes / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
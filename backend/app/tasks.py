@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from app.database import session_scope
+from app.models import JobLease
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    """Identify this process as a lease holder"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(name: str, ttl: timedelta) -> bool:
+    """
+    Take or renew the lease on a job, so that only one of several worker
+    processes sharing the database runs it.
+
+    The lease is granted if nobody holds it, this process already holds it,
+    or the holder let it expire (e.g. because it stopped).
+
+    Args:
+        name: Job name
+        ttl: How long the lease stays valid without renewal
+
+    Returns:
+        bool: True if this process holds the lease now
+    """
+    owner = worker_id()
+    now = datetime.utcnow()
+    with session_scope() as db:
+        renewed = db.query(JobLease).filter(
+            JobLease.name == name,
+            or_(JobLease.owner == owner, JobLease.expires_at < now)
+        ).update({"owner": owner, "expires_at": now + ttl}, synchronize_session=False)
+        if not renewed:
+            if db.get(JobLease, name) is not None:
+                db.rollback()
+                return False
+            db.add(JobLease(name=name, owner=owner, expires_at=now + ttl))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another process created the lease first
+            db.rollback()
+            return False
+    return True
+
+
+async def run_periodic(name: str, interval_seconds: float, job: Callable[[], object], exclusive: bool = True):
+    """
+    Run a blocking job every interval_seconds in a worker thread until cancelled.
+    Failures are logged and the job runs again at the next interval.
+
+    With exclusive set, each run first takes the job's lease in the database,
+    so when several workers run this loop only the lease holder runs the job.
+    The lease lasts two intervals, so another worker takes over within two
+    intervals after the holder stops.
+
+    Args:
+        name: Job name used in log messages and as the lease name
+        interval_seconds: Delay between runs
+        job: Blocking callable (typically opens its own database session)
+        exclusive: Run the job in only one process at a time
+    """
+    ttl = timedelta(seconds=2 * interval_seconds)
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if exclusive and not await asyncio.to_thread(acquire_lease, name, ttl):
+                continue
+            await asyncio.to_thread(job)
+        except Exception:
+            logger.exception("Background job %s failed", name)
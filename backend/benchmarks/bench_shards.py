@@ -0,0 +1,94 @@
+"""
+Write-scaling benchmark for address-sharded storage.
+
+For each shard count, creates that many SQLite files, spreads --wallets
+wallets over them and runs --workers writer processes (like uvicorn
+--workers) doing random transfers through app.sharding.transfer().
+--cross-shard sets the share of transfers whose recipient lives on another
+shard. SQLite serializes writers per file, so with enough CPU cores
+throughput grows with the shard count; on a single core the per-transfer
+CPU cost dominates and only lock waits go down.
+
+Usage (from the backend directory):
+    python benchmarks/bench_shards.py --shards 1 2 4 8 --workers 8 --transfers 4000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.sharding import ShardRouter, create_wallet, transfer  # noqa: E402
+
+
+def worker(urls: list[str], by_shard: list[list[str]], transfers: int, cross_shard: float, seed: int) -> int:
+    """Run transfers in a separate process; returns how many crossed shards"""
+    router = ShardRouter(urls)
+    rng = random.Random(seed)
+    everyone = [address for addresses in by_shard for address in addresses]
+    crossed = 0
+    for _ in range(transfers):
+        sender = rng.choice(everyone)
+        home = router.shard_for(sender)
+        if len(urls) > 1 and rng.random() < cross_shard:
+            pool = rng.choice([addresses for i, addresses in enumerate(by_shard) if i != home and addresses])
+        else:
+            pool = by_shard[home]
+        if transfer(router, sender, rng.choice(pool), 0.01)["cross_shard"]:
+            crossed += 1
+    router.dispose()
+    return crossed
+
+
+def run(shards: int, wallets: int, workers: int, transfers: int, cross_shard: float, seed: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        urls = [f"sqlite:///{os.path.join(tmp, f'shard{i}.db')}" for i in range(shards)]
+        router = ShardRouter(urls)
+        router.ensure_schemas()
+
+        by_shard: list[list[str]] = [[] for _ in range(shards)]
+        for _ in range(wallets):
+            address = "0x" + secrets.token_hex(20)
+            create_wallet(router, address, secrets.token_hex(32), balance=1e9)
+            by_shard[router.shard_for(address)].append(address)
+        router.dispose()
+
+        per_worker = transfers // workers
+        with multiprocessing.Pool(workers) as pool:
+            started = time.perf_counter()
+            crossed = pool.starmap(worker, [
+                (urls, by_shard, per_worker, cross_shard, seed + i) for i in range(workers)
+            ])
+            elapsed = time.perf_counter() - started
+
+    done = per_worker * workers
+    return {"shards": shards, "transfers": done, "cross_shard": sum(crossed), "seconds": elapsed,
+            "rate": done / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--wallets", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8, help="Writer processes")
+    parser.add_argument("--transfers", type=int, default=4000, help="Transfers per shard count")
+    parser.add_argument("--cross-shard", type=float, default=0.1, help="Share of cross-shard transfers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'shards':>6} {'transfers':>10} {'cross':>7} {'seconds':>9} {'transfers/s':>12} {'speedup':>8}")
+    baseline = None
+    for shards in args.shards:
+        result = run(shards, args.wallets, args.workers, args.transfers, args.cross_shard, args.seed)
+        baseline = baseline or result["rate"]
+        print(f"{result['shards']:>6} {result['transfers']:>10} {result['cross_shard']:>7} "
+              f"{result['seconds']:>9.2f} {result['rate']:>12,.0f} {result['rate'] / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Import-time and cold-start benchmark.
+
+Each measurement runs in a fresh interpreter, the way a new uvicorn worker or a
+test collection run would see it.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each snippet prints the elapsed seconds of the phase being measured
+SNIPPETS = {
+    "import app.main": """
+import time
+t = time.perf_counter()
+import app.main
+print(time.perf_counter() - t)
+""",
+    "create_app()": """
+import time
+t = time.perf_counter()
+from app.main import create_app
+create_app()
+print(time.perf_counter() - t)
+""",
+    "cold start (schema check)": """
+import asyncio, time
+t = time.perf_counter()
+from app.main import create_app, lifespan
+app = create_app()
+async def startup():
+    async with lifespan(app):
+        pass
+asyncio.run(startup())
+print(time.perf_counter() - t)
+""",
+    "cold start (create_all)": """
+import time
+t = time.perf_counter()
+from app.main import create_app
+from app.database import Base, get_engine
+import app.models
+app = create_app()
+Base.metadata.create_all(bind=get_engine())
+print(time.perf_counter() - t)
+""",
+}
+
+
+def run_snippet(code: str, env: dict) -> float:
+    """Run a snippet in a fresh interpreter and return the time it reports"""
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter launches per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        # Build the schema once so cold starts measure an existing database
+        run_snippet(SNIPPETS["cold start (schema check)"], env)
+
+        print(f"{'phase':<28} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+        for name, code in SNIPPETS.items():
+            timings = [run_snippet(code, env) * 1000 for _ in range(args.runs)]
+            print(f"{name:<28} {statistics.median(timings):>10.1f} {min(timings):>10.1f} {max(timings):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+WebSocket soak test: hold many idle connections and report server memory per connection.
+
+Starts the API server in a subprocess (python -m app) against a temporary
+database, opens --connections idle sockets to /ws/{wallet_address}, holds
+them for --hold seconds and compares the server's resident memory before
+and after. Client sockets are spread over several loopback source addresses
+so the test is not limited by ephemeral ports.
+
+Usage (from the backend directory):
+    python benchmarks/ws_soak.py --connections 20000 --hold 30
+
+Both processes need a file descriptor limit above --connections (ulimit -n).
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_ADDRESSES = 200  # 127.0.0.1 ... 127.0.0.200
+PER_SOURCE_ADDRESS = 20000
+
+
+def rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmRSS not found")
+
+
+def get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def wait_until_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            get_json(f"{base_url}/health")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def open_connections(port: int, count: int, concurrency: int) -> list:
+    from websockets.asyncio.client import connect
+
+    semaphore = asyncio.Semaphore(concurrency)
+    sockets = []
+    failures = 0
+
+    async def open_one(index: int):
+        nonlocal failures
+        source = f"127.0.0.{1 + index // PER_SOURCE_ADDRESS % SOURCE_ADDRESSES}"
+        async with semaphore:
+            try:
+                sockets.append(await connect(
+                    f"ws://127.0.0.1:{port}/ws/0x{index:040x}",
+                    local_addr=(source, 0),
+                    compression=None,
+                    ping_interval=None,
+                    open_timeout=60,
+                ))
+            except Exception:
+                failures += 1
+
+    await asyncio.gather(*(open_one(i) for i in range(count)))
+    if failures:
+        print(f"Failed to open {failures} connections")
+    return sockets
+
+
+async def soak(args, base_url: str, server_pid: int):
+    baseline = rss_bytes(server_pid)
+
+    started = time.perf_counter()
+    sockets = await open_connections(args.port, args.connections, args.concurrency)
+    connect_seconds = time.perf_counter() - started
+
+    await asyncio.sleep(args.hold)
+    loaded = rss_bytes(server_pid)
+    stats = (await asyncio.to_thread(get_json, f"{base_url}/metrics"))["websockets"]
+
+    print(f"connections open      {stats['connections']:>12,}")
+    print(f"connect time          {connect_seconds:>12.2f} s "
+          f"({len(sockets) / connect_seconds:,.0f} conn/s)")
+    print(f"server RSS baseline   {baseline / 2**20:>12.1f} MiB")
+    print(f"server RSS loaded     {loaded / 2**20:>12.1f} MiB")
+    if stats["connections"]:
+        print(f"memory per connection {(loaded - baseline) / stats['connections'] / 1024:>12.1f} KiB")
+
+    await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--hold", type=float, default=10, help="Seconds to hold the connections open")
+    parser.add_argument("--concurrency", type=int, default=500, help="Connections opened in parallel")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    # Let this process and the server (which inherits the limit) hold all sockets
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard < args.connections + 100:
+        print(f"Warning: file descriptor limit {hard} is below --connections")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'soak.db')}",
+            WS_MAX_CONNECTIONS=str(args.connections + 100),
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app", "--port", str(args.port)],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            wait_until_ready(base_url)
+            asyncio.run(soak(args, base_url, server.pid))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import database
+from app.config import get_settings
+from app.connections import get_manager
+from app.events import get_streams
+from app.main import create_app
+from app.sharding import get_router
+from app.singleflight import get_flight
+
+# Process-wide objects built from the settings on first use
+CACHED = (get_settings, get_router, get_flight, get_streams, get_manager)
+
+
+def reset_app_state():
+    """Forget the cached settings, engines and registries so the next use re-reads the environment"""
+    if get_router.cache_info().currsize and get_router() is not None:
+        get_router().dispose()
+    if database._engine is not None:
+        database._engine.dispose()
+        database._engine = None
+    for cached in CACHED:
+        cached.cache_clear()
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    """Point DATABASE_URL at a temporary SQLite file, with sharding off"""
+    url = f"sqlite:///{tmp_path / 'wallet.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    monkeypatch.delenv("SHARD_URLS", raising=False)
+    reset_app_state()
+    yield url
+    reset_app_state()
+
+
+@pytest.fixture
+def client(database_url):
+    with TestClient(create_app()) as client:
+        yield client
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+import pytest
+from app.database import session_scope
+from app.models import Notification, Wallet
+
+OWNER = "0x" + "a" * 40
+OTHER = "0x" + "b" * 40
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def notifications(client):
+    """Seven notifications of OWNER (two pairs share a timestamp) and one of OTHER; returns OWNER's IDs, newest first"""
+    with session_scope() as db:
+        db.add_all([Wallet(address=address, private_key="key") for address in (OWNER, OTHER)])
+        rows = [
+            Notification(wallet_address=OWNER, message=f"n{i}", type="info", read=i % 2 == 0,
+                         created_at=START + timedelta(minutes=minute))
+            for i, minute in enumerate([0, 1, 1, 2, 3, 3, 4])
+        ]
+        db.add_all(rows)
+        db.add(Notification(wallet_address=OTHER, message="other", type="info", created_at=START))
+        db.commit()
+        ordered = sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)
+        return [row.id for row in ordered]
+
+
+def page_through(client, limit: int) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit} if cursor is None else {"limit": limit, "cursor": cursor}
+        response = client.get(f"/notifications/{OWNER}", params=params)
+        pages.append([notification["id"] for notification in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_notification_once(client, notifications):
+    pages = page_through(client, 2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert sum(pages, []) == notifications
+
+
+def test_cursor_survives_deleting_its_notification(client, notifications):
+    first = client.get(f"/notifications/{OWNER}", params={"limit": 3})
+    client.delete(f"/notifications/{notifications[2]}")
+
+    rest = client.get(f"/notifications/{OWNER}", params={"cursor": first.headers["X-Next-Cursor"]})
+
+    assert [notification["id"] for notification in rest.json()] == notifications[3:]
+
+
+def test_invalid_cursor(client, notifications):
+    assert client.get(f"/notifications/{OWNER}", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_unread_count_and_read_all(client, notifications):
+    assert client.get(f"/notifications/{OWNER}/unread-count").json()["unread"] == 3
+
+    assert client.put(f"/notifications/{OWNER}/read-all").json()["affected"] == 3
+    assert client.get(f"/notifications/{OWNER}/unread-count").json()["unread"] == 0
+
+
+def test_bulk_delete_by_ids_only_touches_the_wallet(client, notifications):
+    with session_scope() as db:
+        other_id = db.query(Notification.id).filter(Notification.wallet_address == OTHER).scalar()
+
+    response = client.delete(f"/notifications/{OWNER}", params={"ids": [notifications[0], notifications[1], other_id]})
+
+    assert response.json()["affected"] == 2
+    assert sum(page_through(client, 10), []) == notifications[2:]
+    assert len(client.get(f"/notifications/{OTHER}").json()) == 1
+
+
+def test_bulk_delete_older_than_accepts_a_utc_offset(client, notifications):
+    # 02:03+02:00 is 00:03 UTC: the notifications of minutes 0, 1 and 2 are older
+    response = client.delete(f"/notifications/{OWNER}", params={"older_than": "2026-01-01T02:03:00+02:00"})
+
+    assert response.json()["affected"] == 4
+    assert sum(page_through(client, 10), []) == notifications[:3]
+
+
+def test_bulk_delete_needs_a_filter(client, notifications):
+    assert client.delete(f"/notifications/{OWNER}").status_code == 400
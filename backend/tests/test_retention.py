@@ -0,0 +1,91 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+import pytest
+from app.database import get_engine, session_scope
+from app.models import Notification, Wallet
+from app.retention import RetentionPolicy, compact_notifications
+from app.schema import ensure_schema
+
+BUSY = "0x" + "a" * 40
+QUIET = "0x" + "b" * 40
+
+
+@pytest.fixture
+def db(database_url):
+    ensure_schema(get_engine())
+    with session_scope() as db:
+        db.add_all([Wallet(address=address, private_key="key") for address in (BUSY, QUIET)])
+        db.commit()
+        yield db
+
+
+def add(db, wallet_address: str, age_days: float, read: bool) -> int:
+    notification = Notification(
+        wallet_address=wallet_address, message="m", type="info", read=read,
+        created_at=datetime.utcnow() - timedelta(days=age_days)
+    )
+    db.add(notification)
+    db.commit()
+    return notification.id
+
+
+def remaining(db) -> set[int]:
+    db.expire_all()
+    return {row.id for row in db.query(Notification.id)}
+
+
+def test_nothing_is_deleted_by_default(db):
+    ids = {add(db, BUSY, 1000, read=True) for _ in range(3)}
+
+    report = compact_notifications()
+
+    assert report.deleted == 0
+    assert remaining(db) == ids
+
+
+def test_max_age_keeps_unread(db):
+    add(db, BUSY, 40, read=True)
+    old_unread = add(db, BUSY, 40, read=False)
+    recent_read = add(db, BUSY, 1, read=True)
+
+    report = compact_notifications(RetentionPolicy(max_age=timedelta(days=30)))
+
+    assert report.expired == 1
+    assert remaining(db) == {old_unread, recent_read}
+
+
+def test_max_age_without_keep_unread(db):
+    add(db, BUSY, 40, read=True)
+    add(db, BUSY, 40, read=False)
+    recent = add(db, BUSY, 1, read=False)
+
+    report = compact_notifications(RetentionPolicy(max_age=timedelta(days=30), keep_unread=False))
+
+    assert report.expired == 2
+    assert remaining(db) == {recent}
+
+
+def test_max_per_wallet_trims_the_oldest_read(db):
+    # Oldest first: read, unread, read, read, read
+    busy = [add(db, BUSY, 10 - age, read=age != 1) for age in range(5)]
+    quiet = [add(db, QUIET, 10, read=True) for _ in range(2)]
+
+    report = compact_notifications(RetentionPolicy(max_per_wallet=2, batch_size=1))
+
+    # The two newest stay; of the older three only the unread one is kept
+    assert report.over_limit == 2
+    assert report.batches == 2
+    assert remaining(db) == {busy[1], busy[3], busy[4], *quiet}
+
+
+def test_deleted_rows_are_archived(db, tmp_path):
+    old = add(db, BUSY, 40, read=True)
+    add(db, BUSY, 1, read=True)
+
+    report = compact_notifications(RetentionPolicy(max_age=timedelta(days=30), archive_dir=str(tmp_path)))
+
+    with gzip.open(report.archive_path, "rt", encoding="utf-8") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert report.archived == 1
+    assert [(row["id"], row["wallet_address"]) for row in rows] == [(old, BUSY)]
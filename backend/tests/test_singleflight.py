@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import pytest
+from app.singleflight import SingleFlight
+
+
+def run_concurrently(flight: SingleFlight, fn, callers: int) -> list:
+    """Start callers requests for one key while fn is blocked, then let it finish; returns results or exceptions"""
+    gate = threading.Event()
+
+    def blocked():
+        gate.wait(5)
+        return fn()
+
+    async def main():
+        tasks = [asyncio.create_task(flight.do("key", blocked)) for _ in range(callers)]
+        # Every caller reaches the flight before the read completes
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_concurrent_reads_share_one_execution():
+    calls = []
+    flight = SingleFlight()
+
+    results = run_concurrently(flight, lambda: calls.append(1) or len(calls), callers=5)
+
+    assert results == [1] * 5
+    assert flight.stats() == {
+        "requests": 5, "executions": 1, "overflows": 0, "in_flight": 0, "coalescing_ratio": pytest.approx(0.8)
+    }
+
+
+def test_errors_reach_every_waiter():
+    def fail():
+        raise LookupError("not found")
+
+    flight = SingleFlight()
+
+    results = run_concurrently(flight, fail, callers=3)
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert flight.stats()["executions"] == 1
+    # The failed flight is forgotten, so the next request runs again
+    assert asyncio.run(flight.do("key", lambda: "ok")) == "ok"
+    assert flight.stats()["executions"] == 2
+
+
+def test_waiters_beyond_the_limit_run_their_own_read():
+    calls = []
+    flight = SingleFlight(max_waiters=2)
+
+    results = run_concurrently(flight, lambda: calls.append(1) or "row", callers=5)
+
+    # One leader, two waiters on its flight, two independent reads
+    assert results == ["row"] * 5
+    assert len(calls) == 3
+    assert flight.stats()["overflows"] == 2
+
+
+def test_coalesced_route_returns_errors(client):
+    assert client.get("/wallet/info/0xmissing").status_code == 404
+    assert client.get("/transactions/0xmissing").status_code == 404
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from typing import Optional
+import pytest
+from app.database import session_scope
+from app.models import INITIAL_BALANCE, BalanceSnapshot, Transaction, Wallet
+from app.snapshots import balance_at, take_snapshots
+
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+START = datetime(2026, 1, 1)
+
+
+def hour(n: float) -> datetime:
+    return START + timedelta(hours=n)
+
+
+def send(client, sender: str, recipient: str, amount: float, at: datetime):
+    """Send through the API, then move the transfer to a fixed time"""
+    tx_id = client.post(
+        "/transactions/send", json={"sender_address": sender, "recipient_address": recipient, "amount": amount}
+    ).json()["id"]
+    with session_scope() as db:
+        db.query(Transaction).filter(Transaction.id == tx_id).update({"timestamp": at})
+        db.commit()
+
+
+@pytest.fixture
+def ledger(client):
+    """ALICE pays BOB 1.0 at hours 1, 2 and 3"""
+    for address in (ALICE, BOB):
+        client.post("/auth/import", json={"address": address, "private_key": "key"})
+    with session_scope() as db:
+        db.query(Wallet).update({"created_at": START})
+        db.commit()
+    for n in (1, 2, 3):
+        send(client, ALICE, BOB, 1.0, hour(n))
+    return client
+
+
+def alice_at(at: datetime) -> tuple[float, Optional[BalanceSnapshot], int]:
+    with session_scope() as db:
+        return balance_at(db, ALICE, at)
+
+
+def test_without_snapshot_the_history_is_replayed(ledger):
+    assert alice_at(hour(0)) == (pytest.approx(INITIAL_BALANCE), None, 0)
+    assert alice_at(hour(2.5)) == (pytest.approx(INITIAL_BALANCE - 2.0), None, 2)
+    assert alice_at(hour(4)) == (pytest.approx(INITIAL_BALANCE - 3.0), None, 3)
+
+
+def test_snapshot_limits_the_replay(ledger):
+    assert take_snapshots().written == 2
+    send(ledger, ALICE, BOB, 0.25, hour(5))
+
+    balance, snapshot, replayed = alice_at(hour(6))
+
+    assert snapshot.last_transaction_id == 3
+    assert replayed == 1
+    assert balance == pytest.approx(INITIAL_BALANCE - 3.25)
+    # Before the snapshot's ledger position the history is replayed instead
+    assert alice_at(hour(2.5)) == (pytest.approx(INITIAL_BALANCE - 2.0), None, 2)
+
+
+def test_snapshot_is_chosen_by_ledger_position_not_taken_at(ledger):
+    # Stamped before the run but including the transfer of hour 3, as a
+    # snapshot taken while that transfer committed would be
+    with session_scope() as db:
+        db.add(BalanceSnapshot(
+            address=ALICE, balance=INITIAL_BALANCE - 3.0, last_transaction_id=3,
+            last_transaction_at=hour(3), taken_at=hour(2.5)
+        ))
+        db.commit()
+
+    assert alice_at(hour(2.75)) == (pytest.approx(INITIAL_BALANCE - 2.0), None, 2)
+    balance, snapshot, replayed = alice_at(hour(3))
+    assert (balance, replayed) == (pytest.approx(INITIAL_BALANCE - 3.0), 0)
+    assert snapshot is not None
+
+
+def test_only_changed_wallets_are_snapshotted_again(ledger):
+    take_snapshots()
+    ledger.post("/auth/import", json={"address": "0x" + "c" * 40, "private_key": "key"})
+
+    # No transfers since the last run: only the new wallet is snapshotted
+    assert take_snapshots().written == 1
+    send(ledger, BOB, ALICE, 0.5, hour(4))
+    assert take_snapshots().written == 2
+
+
+def test_balance_route(ledger):
+    take_snapshots()
+
+    at_hour_4 = ledger.get(f"/wallet/balance/{ALICE}", params={"at": "2026-01-01T06:00:00+02:00"}).json()
+    assert at_hour_4["balance"] == pytest.approx(INITIAL_BALANCE - 3.0)
+    assert at_hour_4["at"] == hour(4).isoformat()
+    assert at_hour_4["snapshot_at"] is not None
+    assert at_hour_4["replayed_transactions"] == 0
+
+    before_creation = ledger.get(f"/wallet/balance/{ALICE}", params={"at": "2025-12-31T00:00:00"})
+    assert before_creation.status_code == 404
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import pytest
+from app.config import get_settings
+from app.events import TransactionEvent, get_streams
+from app.routers.transactions import stream_transactions
+
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+CAROL = "0x" + "c" * 40
+
+
+@pytest.fixture
+def sent(client):
+    """Four transfers, returns their IDs; the third does not involve ALICE"""
+    for address in (ALICE, BOB, CAROL):
+        client.post("/auth/import", json={"address": address, "private_key": "key"})
+    transfers = [(ALICE, BOB), (BOB, ALICE), (BOB, CAROL), (ALICE, CAROL)]
+    return [
+        client.post(
+            "/transactions/send", json={"sender_address": sender, "recipient_address": recipient, "amount": 0.1}
+        ).json()["id"]
+        for sender, recipient in transfers
+    ]
+
+
+def run_stream(drive, address: str, last_event_id=None, header=None):
+    """Open a wallet's stream in a new event loop and return drive(next_chunk)"""
+    async def main():
+        response = await stream_transactions(address, last_event_id=last_event_id, last_event_id_header=header)
+        body = response.body_iterator
+
+        async def next_chunk() -> str:
+            return await asyncio.wait_for(body.__anext__(), 5)
+
+        try:
+            return await drive(next_chunk)
+        finally:
+            await body.aclose()
+
+    return asyncio.run(main())
+
+
+def event_id(chunk: str) -> int:
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    assert fields["event"] == "transaction"
+    assert json.loads(fields["data"])["id"] == int(fields["id"])
+    return int(fields["id"])
+
+
+def live_event(id: int) -> TransactionEvent:
+    return TransactionEvent(id=id, sender_address=ALICE, recipient_address=BOB, data=json.dumps({"id": id}))
+
+
+def test_retry_is_short_and_separate_from_the_heartbeat(sent):
+    async def drive(next_chunk):
+        return await next_chunk()
+
+    assert run_stream(drive, ALICE) == f"retry: {get_settings().sse_retry_ms}\n\n"
+    assert get_settings().sse_retry_ms < get_settings().sse_heartbeat_seconds * 1000
+
+
+def test_catch_up_after_last_event_id(sent):
+    async def drive(next_chunk):
+        await next_chunk()  # retry
+        return [event_id(await next_chunk()) for _ in range(2)]
+
+    # ALICE was not part of the third transfer
+    assert run_stream(drive, ALICE, last_event_id=sent[0]) == [sent[1], sent[3]]
+
+
+def test_header_takes_precedence_over_the_query(sent):
+    async def drive(next_chunk):
+        await next_chunk()
+        return event_id(await next_chunk())
+
+    assert run_stream(drive, ALICE, last_event_id=sent[0], header=sent[1]) == sent[3]
+
+
+def test_live_events_follow_the_catch_up_without_repeats(sent):
+    async def drive(next_chunk):
+        await next_chunk()
+        caught_up = event_id(await next_chunk())
+        # Already sent during the catch-up: skipped
+        get_streams().publish(live_event(sent[3]))
+        get_streams().publish(live_event(sent[3] + 1))
+        return caught_up, event_id(await next_chunk())
+
+    assert run_stream(drive, ALICE, last_event_id=sent[1]) == (sent[3], sent[3] + 1)
+
+
+def test_without_resume_id_only_new_events_are_sent(sent):
+    async def drive(next_chunk):
+        await next_chunk()
+        get_streams().publish(live_event(99))
+        return event_id(await next_chunk())
+
+    assert run_stream(drive, ALICE) == 99
+
+
+def test_overflow_ends_the_stream(sent):
+    async def drive(next_chunk):
+        await next_chunk()
+        for id in range(100, 101 + get_settings().sse_buffer_size):
+            get_streams().publish(live_event(id))
+        with pytest.raises(StopAsyncIteration):
+            await next_chunk()
+
+    run_stream(drive, ALICE)
@@ -1,9 +1,14 @@
 import { useState, useEffect } from 'react';
 import { notificationsAPI } from '@/lib/api';
 
+const PAGE_SIZE = 20;
+
 export default function NotificationPanel({ walletAddress }) {
   const [notifications, setNotifications] = useState([]);
+  const [unreadCount, setUnreadCount] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   useEffect(() => {
@@ -15,8 +20,13 @@ export default function NotificationPanel({ walletAddress }) {
   const loadNotifications = async () => {
     try {
       setLoading(true);
-      const notifs = await notificationsAPI.getWalletNotifications(walletAddress);
-      setNotifications(notifs);
+      const [page, unread] = await Promise.all([
+        notificationsAPI.getPage(walletAddress, PAGE_SIZE),
+        notificationsAPI.getUnreadCount(walletAddress),
+      ]);
+      setNotifications(page.notifications);
+      setNextCursor(page.nextCursor);
+      setUnreadCount(unread.unread);
       setError(null);
     } catch (err) {
       setError('Failed to load notifications');
@@ -26,23 +36,51 @@ export default function NotificationPanel({ walletAddress }) {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await notificationsAPI.getPage(walletAddress, PAGE_SIZE, nextCursor);
+      setNotifications(prev => [...prev, ...page.notifications]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Failed to load more notifications:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const markAsRead = async (notificationId) => {
     try {
-      await notificationsAPI.markAsRead(notificationId);
+      await notificationsAPI.markAsRead(notificationId, walletAddress);
       setNotifications(prev =>
         prev.map(notif =>
           notif.id === notificationId ? { ...notif, read: true } : notif
         )
       );
+      setUnreadCount(prev => Math.max(prev - 1, 0));
     } catch (err) {
       console.error('Failed to mark notification as read:', err);
     }
   };
 
+  const markAllAsRead = async () => {
+    try {
+      await notificationsAPI.markAllAsRead(walletAddress);
+      setNotifications(prev => prev.map(notif => ({ ...notif, read: true })));
+      setUnreadCount(0);
+    } catch (err) {
+      console.error('Failed to mark notifications as read:', err);
+    }
+  };
+
   const deleteNotification = async (notificationId) => {
     try {
-      await notificationsAPI.delete(notificationId);
+      const deleted = notifications.find(notif => notif.id === notificationId);
+      await notificationsAPI.delete(notificationId, walletAddress);
       setNotifications(prev => prev.filter(notif => notif.id !== notificationId));
+      if (deleted && !deleted.read) {
+        setUnreadCount(prev => Math.max(prev - 1, 0));
+      }
     } catch (err) {
       console.error('Failed to delete notification:', err);
     }
@@ -95,13 +133,30 @@ export default function NotificationPanel({ walletAddress }) {
   return (
     <div className="bg-white rounded-lg shadow-md p-6">
       <div className="flex justify-between items-center mb-4">
-        <h2 className="text-xl font-bold text-gray-800">Notifications</h2>
-        <button
-          onClick={loadNotifications}
-          className="bg-gray-500 hover:bg-gray-600 text-white px-3 py-1 rounded text-sm"
-        >
-          Refresh
-        </button>
+        <div className="flex items-center space-x-2">
+          <h2 className="text-xl font-bold text-gray-800">Notifications</h2>
+          {unreadCount > 0 && (
+            <span className="px-2 py-1 rounded-full text-xs font-medium bg-blue-500 text-white">
+              {unreadCount}
+            </span>
+          )}
+        </div>
+        <div className="flex space-x-2">
+          {unreadCount > 0 && (
+            <button
+              onClick={markAllAsRead}
+              className="bg-blue-500 hover:bg-blue-600 text-white px-3 py-1 rounded text-sm"
+            >
+              Mark All Read
+            </button>
+          )}
+          <button
+            onClick={loadNotifications}
+            className="bg-gray-500 hover:bg-gray-600 text-white px-3 py-1 rounded text-sm"
+          >
+            Refresh
+          </button>
+        </div>
       </div>
 
       {notifications.length === 0 ? (
@@ -147,6 +202,15 @@ export default function NotificationPanel({ walletAddress }) {
               </p>
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="w-full text-blue-600 hover:text-blue-800 text-sm py-2"
+            >
+              {loadingMore ? 'Loading...' : 'Load More'}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -89,8 +89,36 @@ export const notificationsAPI = {
     return response.json();
   },
 
-  markAsRead: async (notificationId) => {
-    const response = await fetch(`${API_BASE_URL}/notifications/${notificationId}/read`, {
+  getPage: async (walletAddress, limit, cursor = null) => {
+    const params = new URLSearchParams({ limit });
+    if (cursor !== null) {
+      params.set('cursor', cursor);
+    }
+    const response = await fetch(`${API_BASE_URL}/notifications/${walletAddress}?${params}`);
+    if (!response.ok) {
+      throw new Error(`Failed to load notifications (HTTP ${response.status})`);
+    }
+    return {
+      notifications: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  },
+
+  getUnreadCount: async (walletAddress) => {
+    const response = await fetch(`${API_BASE_URL}/notifications/${walletAddress}/unread-count`);
+    return response.json();
+  },
+
+  markAllAsRead: async (walletAddress) => {
+    const response = await fetch(`${API_BASE_URL}/notifications/${walletAddress}/read-all`, {
+      method: 'PUT',
+    });
+    return response.json();
+  },
+
+  markAsRead: async (notificationId, walletAddress) => {
+    const params = new URLSearchParams({ wallet_address: walletAddress });
+    const response = await fetch(`${API_BASE_URL}/notifications/${notificationId}/read?${params}`, {
       method: 'PUT',
     });
     return response.json();
@@ -111,8 +139,9 @@ export const notificationsAPI = {
     return response.json();
   },
 
-  delete: async (notificationId) => {
-    const response = await fetch(`${API_BASE_URL}/notifications/${notificationId}`, {
+  delete: async (notificationId, walletAddress) => {
+    const params = new URLSearchParams({ wallet_address: walletAddress });
+    const response = await fetch(`${API_BASE_URL}/notifications/${notificationId}?${params}`, {
       method: 'DELETE',
     });
     return response.json();